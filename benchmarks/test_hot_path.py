@@ -0,0 +1,194 @@
+"""
+Micro-benchmarks of the logging hot path, using pytest-benchmark.
+
+Each benchmarked function logs RECORDS records, so that the number of records per second is
+RECORDS times the operations per second reported by pytest-benchmark.
+
+    make benchmark          # runs benchmarks and stores results in .benchmarks
+    make benchmark-compare  # fails if mean times regressed compared to the last stored results
+
+Memory retained per record is compared with the baseline stored in memory_baseline.json, by Python version,
+failing if it grew by more than MEMORY_TOLERANCE; the baseline is recorded when missing for the running version.
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import tracemalloc
+import pytest
+from typing import List
+from rolog import LoggerFactory, LogLevel, LogRecord, ExceptionLogRecord, FlushLogTarget
+from rolog.targets import BuiltInLoggingTarget
+from tests import InMemoryTarget
+
+
+RECORDS = 1000
+
+MEMORY_TOLERANCE = 0.1
+
+MEMORY_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'memory_baseline.json')
+
+
+class NullFlushLogTarget(FlushLogTarget):
+
+    def __init__(self, max_size):
+        super().__init__(max_size=max_size)
+        self.count = 0
+
+    async def log_records(self, records: List[LogRecord]):
+        self.count += len(records)
+
+
+@pytest.fixture(scope='module')
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def get_logger(*targets, minimum_level=LogLevel.DEBUG):
+    factory = LoggerFactory()
+    factory.min_log_level = LogLevel.DEBUG
+    for target in targets:
+        factory.add_target(target, minimum_level)
+    return factory.get_logger('benchmark')
+
+
+def run_logging(loop, logger, method='info', with_data=True):
+    log = getattr(logger, method)
+
+    async def log_records():
+        if with_data:
+            for i in range(RECORDS):
+                await log('Hello, World %s', i, id=i)
+        else:
+            for i in range(RECORDS):
+                await log('Hello, World %s', i)
+
+    loop.run_until_complete(log_records())
+
+
+def records_per_second(benchmark):
+    benchmark.extra_info['records'] = RECORDS
+    if benchmark.stats is not None:
+        # stats are not available when benchmarks are disabled
+        benchmark.extra_info['records_per_second'] = RECORDS / benchmark.stats.stats.mean
+
+
+@pytest.mark.parametrize('targets_count', [0, 1, 5])
+def test_logger_log(benchmark, loop, targets_count):
+    logger = get_logger(*[InMemoryTarget() for _ in range(targets_count)])
+
+    benchmark(run_logging, loop, logger)
+    records_per_second(benchmark)
+
+
+def test_logger_log_filtered_level(benchmark, loop):
+    logger = get_logger(InMemoryTarget(), minimum_level=LogLevel.ERROR)
+
+    benchmark(run_logging, loop, logger, 'debug')
+    records_per_second(benchmark)
+
+
+@pytest.mark.parametrize('max_size', [10, 100, 1000])
+def test_flush_target_throughput(benchmark, loop, max_size):
+    target = NullFlushLogTarget(max_size)
+    logger = get_logger(target)
+
+    benchmark(run_logging, loop, logger)
+    records_per_second(benchmark)
+
+
+def test_logger_log_nowait_flush_target(benchmark, loop):
+    target = NullFlushLogTarget(100)
+    logger = get_logger(target)
+
+    def log_records():
+        for i in range(RECORDS):
+            logger.info_nowait('Hello, World %s', i, id=i)
+
+    benchmark(log_records)
+    records_per_second(benchmark)
+
+
+def test_exception_record_creation(benchmark):
+    try:
+        1 / 0
+    except ZeroDivisionError as zero_division_error:
+        exception = zero_division_error
+
+    def create_records():
+        for i in range(RECORDS):
+            ExceptionLogRecord('benchmark', LogLevel.ERROR, 'Oh, no!', exception, i, id=i)
+
+    benchmark(create_records)
+    records_per_second(benchmark)
+
+
+def test_builtin_logging_target(benchmark, loop):
+    sync_logger = logging.getLogger('rolog.benchmark')
+    sync_logger.setLevel(logging.DEBUG)
+    sync_logger.propagate = False
+    sync_logger.addHandler(logging.NullHandler())
+
+    logger = get_logger(BuiltInLoggingTarget(sync_logger))
+
+    # keyword arguments are passed to the built-in logger, which doesn't support arbitrary data
+    benchmark(run_logging, loop, logger, with_data=False)
+    records_per_second(benchmark)
+
+
+def check_memory_baseline(name: str, measures: dict):
+    try:
+        with open(MEMORY_BASELINE_PATH, mode='rt', encoding='utf8') as baseline_file:
+            baselines = json.load(baseline_file)
+    except FileNotFoundError:
+        baselines = {}
+
+    version = f'{sys.version_info.major}.{sys.version_info.minor}'
+    baseline = baselines.setdefault(version, {}).get(name)
+    if baseline is None:
+        baselines[version][name] = measures
+        with open(MEMORY_BASELINE_PATH, mode='wt', encoding='utf8') as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        return
+
+    for key, value in measures.items():
+        assert value <= baseline[key] * (1 + MEMORY_TOLERANCE), \
+            f'{key} for {name} regressed: {value}, baseline {baseline[key]}'
+
+
+@pytest.mark.parametrize('record_type', [LogRecord, ExceptionLogRecord])
+def test_memory_per_record(benchmark, record_type):
+    def create_record(i):
+        if record_type is ExceptionLogRecord:
+            return ExceptionLogRecord('benchmark', LogLevel.ERROR, 'Oh, no!', None, i, id=i)
+        return LogRecord('benchmark', LogLevel.INFORMATION, 'Hello, World %s', i, id=i)
+
+    def create_records():
+        return [create_record(i) for i in range(RECORDS)]
+
+    # warming up, so that allocations done once (e.g. caches, free lists) are not counted
+    create_records()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        records = create_records()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    statistics = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in statistics)
+    size = sum(stat.size_diff for stat in statistics)
+
+    assert len(records) == RECORDS
+
+    measures = {'retained_blocks_per_record': blocks / RECORDS, 'retained_bytes_per_record': size / RECORDS}
+    check_memory_baseline(record_type.__name__, measures)
+
+    benchmark(create_records)
+    benchmark.extra_info.update(measures)
+    records_per_second(benchmark)
@@ -1,13 +1,82 @@
 import sys
+import time
+import heapq
+import random
 import asyncio
 import warnings
 import traceback
-from datetime import datetime
+from functools import partial
+from array import array
+from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
-from enum import IntEnum
-from collections import OrderedDict
-from typing import Optional, List
-from asyncio import Queue, QueueEmpty
+from enum import Enum, IntEnum
+from collections import OrderedDict, deque
+from typing import Optional, List, Union, Mapping
+from asyncio import Queue
+
+
+def _get_running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# references to tasks started by log_nowait, to not have them garbage collected before completion
+_pending_tasks = set()
+
+# message templates shared by records; the table is bounded, since messages with args may also be built dynamically,
+# and sys.intern is not used because interned strings are never released since Python 3.12
+MAX_TEMPLATES = 4096
+
+_templates = {}
+
+
+def _on_log_task_done(target, task: asyncio.Task):
+    _pending_tasks.discard(task)
+    if task.cancelled():
+        return
+
+    exception = task.exception()
+    if exception is not None:
+        # exceptions of scheduled tasks are retrieved here, since nobody awaits them
+        warnings.warn(f'Failed to log record for {target.__class__.__name__}. '
+                      f'Exception: {str(exception)}', RuntimeWarning)
+
+
+def _resume(coroutine, yielded):
+    # continues a coroutine that suspended while driven synchronously, passing values and exceptions
+    # of the event loop through
+    while True:
+        try:
+            sent = yield yielded
+        except BaseException as ex:
+            try:
+                yielded = coroutine.throw(ex)
+            except StopIteration as stop:
+                return stop.value
+        else:
+            try:
+                yielded = coroutine.send(sent)
+            except StopIteration as stop:
+                return stop.value
+
+
+class _SuspendedCoroutine:
+
+    __slots__ = ('_coroutine',
+                 '_yielded')
+
+    def __init__(self, coroutine, yielded):
+        self._coroutine = coroutine
+        self._yielded = yielded
+
+    def __await__(self):
+        return _resume(self._coroutine, self._yielded)
+
+
+async def _complete(suspended: _SuspendedCoroutine):
+    await suspended
 
 
 class LogLevel(IntEnum):
@@ -19,39 +88,365 @@ class LogLevel(IntEnum):
     CRITICAL = 50
 
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LRUCache:
+    """Dictionary of items optionally bounded by size, discarding the least recently used items."""
+
+    __slots__ = ('max_size',
+                 'hits',
+                 'misses',
+                 '_items')
+
+    def __init__(self, max_size: Optional[int] = None):
+        if max_size is not None and max_size < 1:
+            raise ValueError('max_size must be positive and greater than 1')
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        if self.max_size is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._items[key] = value
+        if self.max_size is not None:
+            self._items.move_to_end(key)
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class OverflowPolicy(Enum):
+    """Policies applied by flush targets when their queue of records is full."""
+    BLOCK = 'block'
+    DROP_NEWEST = 'drop_newest'
+    DROP_OLDEST = 'drop_oldest'
+    FALLBACK = 'fallback'
+
+
+class CircuitState(Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker for flush targets: after a number of consecutive failures, the circuit opens and
+    records are sent directly to the fallback target, until the recovery timeout elapses; then a single
+    attempt is allowed (half open state), closing the circuit if it succeeds, or opening it again.
+    Other requests are denied while the attempt is in progress, or until the recovery timeout elapses again,
+    in case its outcome is never recorded."""
+
+    __slots__ = ('failure_threshold',
+                 'recovery_timeout',
+                 '_state',
+                 '_failures',
+                 '_opened_at',
+                 '_probe_started_at')
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be positive and greater than 1')
+
+        if recovery_timeout < 0:
+            raise ValueError('recovery_timeout must be a positive number')
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None  # type: Optional[float]
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.OPEN:
+            return False
+
+        now = time.monotonic()
+        if self._probe_started_at is not None and now - self._probe_started_at < self.recovery_timeout:
+            # a single attempt is allowed in half open state
+            return False
+        self._probe_started_at = now
+        return True
+
+    def record_success(self):
+        self._failures = 0
+        self._state = CircuitState.CLOSED
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_started_at = None
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+
 class LogRecord:
 
-    __slots__ = ('time',
+    __slots__ = ('time_ns',
+                 '_time',
                  'logger_name',
                  'level',
                  'message',
                  'args',
-                 'data')
+                 'data',
+                 '_formatted')
+
+    # records collapsing duplicates define these as instance attributes
+    repeat_count = 1
+    last_time_ns = None  # type: Optional[int]
 
     def __init__(self, _logger_name, _logger_level, message, *args, **kwargs):
-        self.time = datetime.utcnow()
+        # the datetime is created lazily from nanoseconds since epoch, when accessed
+        self.time_ns = time.time_ns()
+        self._time = None
         self.logger_name = _logger_name
         self.level = _logger_level  # type: LogLevel
+        if args and type(message) is str:
+            # messages with args are templates: a single copy is kept for identical ones
+            template = _templates.get(message)
+            if template is not None:
+                message = template
+            elif len(_templates) < MAX_TEMPLATES:
+                _templates[message] = message
         self.message = message
         self.args = args
         self.data = kwargs
+        self._formatted = None
+
+    @property
+    def time(self) -> datetime:
+        """Returns the UTC time of the record."""
+        if self._time is None:
+            self._time = _EPOCH + timedelta(microseconds=self.time_ns // 1000)
+        return self._time
+
+    @time.setter
+    def time(self, value: datetime):
+        self._time = value
+        self.time_ns = (value - _EPOCH) // timedelta(microseconds=1) * 1000
+
+    @property
+    def formatted(self) -> str:
+        """Returns the message formatted with args, computed once and shared by all targets."""
+        if self._formatted is None:
+            self._formatted = self.format()
+        return self._formatted
+
+    def format(self) -> str:
+        """Formats the message with args using printf-style formatting, like the built-in logging module;
+        args not used by the message are appended to it."""
+        message = str(self.message)
+        args = self.args
+        if not args:
+            return message
+
+        if len(args) == 1 and isinstance(args[0], Mapping) and args[0]:
+            args = args[0]
+        try:
+            return message % args
+        except (TypeError, ValueError, KeyError):
+            return ' '.join([message, *(str(arg) for arg in self.args)])
 
 
 class ExceptionLogRecord(LogRecord):
 
-    __slots__ = ('time',
-                 'logger_name',
-                 'level',
-                 'message',
-                 'args',
-                 'data',
-                 'exception')
+    __slots__ = ('exception',)
 
     def __init__(self, _logger_name, _logger_level, message, exception, *args, **kwargs):
         super().__init__(_logger_name, _logger_level, message, *args, **kwargs)
         self.exception = exception
 
 
+class RepeatedLogRecord(LogRecord):
+    """Log record standing for identical records: time is the time of the first one."""
+
+    __slots__ = ('repeat_count',
+                 'last_time_ns')
+
+
+class RepeatedExceptionLogRecord(ExceptionLogRecord):
+    """Exception log record standing for identical records: time is the time of the first one."""
+
+    __slots__ = ('repeat_count',
+                 'last_time_ns')
+
+
+def _to_repeated_record(record: LogRecord, repeat_count: int, last_time_ns: int) -> LogRecord:
+    if isinstance(record, ExceptionLogRecord):
+        repeated = RepeatedExceptionLogRecord.__new__(RepeatedExceptionLogRecord)
+        repeated.exception = record.exception
+    else:
+        repeated = RepeatedLogRecord.__new__(RepeatedLogRecord)
+
+    repeated.time_ns = record.time_ns
+    repeated._time = record._time
+    repeated.logger_name = record.logger_name
+    repeated.level = record.level
+    repeated.message = record.message
+    repeated.args = record.args
+    repeated.data = record.data
+    repeated._formatted = record._formatted
+    repeated.repeat_count = repeat_count
+    repeated.last_time_ns = last_time_ns
+    return repeated
+
+
+def _get_duplicate_key(record: LogRecord):
+    key = (record.logger_name, record.level, record.message, record.args, tuple(record.data.items()))
+    if isinstance(record, ExceptionLogRecord):
+        exception = record.exception
+        return key + (type(exception), str(exception))
+    return key
+
+
+def collapse_duplicates(records: List[LogRecord]) -> List[LogRecord]:
+    """Collapses identical records (same logger name, level, message, args, data and exception type and message)
+    into a single record with repeat count and time of the last one, keeping the order of first occurrences.
+    Records with values that cannot be hashed are kept as they are."""
+    collapsed = []
+    indexes = {}
+    # repeat count and last time by index of the first record
+    repeats = {}
+    for record in records:
+        try:
+            key = _get_duplicate_key(record)
+            index = indexes.get(key)
+        except TypeError:
+            collapsed.append(record)
+            continue
+
+        if index is None:
+            indexes[key] = len(collapsed)
+            collapsed.append(record)
+            continue
+
+        repeat = repeats.get(index)
+        if repeat is None:
+            first = collapsed[index]
+            repeat = repeats[index] = [first.repeat_count, first.last_time_ns or first.time_ns]
+
+        repeat[0] += record.repeat_count
+        repeat[1] = record.last_time_ns or record.time_ns
+
+    for index, (repeat_count, last_time_ns) in repeats.items():
+        collapsed[index] = _to_repeated_record(collapsed[index], repeat_count, last_time_ns)
+    return collapsed
+
+
+_LOG_LEVELS = {level.value: level for level in LogLevel}
+
+
+class RecordBatch:
+    """Columnar representation of a group of records: timestamps and levels are stored in arrays,
+    and empty data dictionaries are not kept."""
+
+    __slots__ = ('times_ns',
+                 'levels',
+                 'logger_names',
+                 'messages',
+                 'args',
+                 'data',
+                 'exceptions',
+                 'repeats')
+
+    def __init__(self):
+        self.times_ns = array('q')
+        self.levels = array('B')
+        self.logger_names = []  # type: List[str]
+        self.messages = []
+        self.args = []  # type: List[tuple]
+        self.data = []  # type: List[Optional[dict]]
+        # exceptions and (repeat count, last time) of repeated records by record index, since these are usually few
+        self.exceptions = {}
+        self.repeats = {}
+
+    @classmethod
+    def from_records(cls, records: List[LogRecord]) -> 'RecordBatch':
+        batch = cls()
+        for record in records:
+            batch.append(record)
+        return batch
+
+    def append(self, record: LogRecord):
+        if isinstance(record, ExceptionLogRecord):
+            self.exceptions[len(self.messages)] = record.exception
+        if record.repeat_count > 1:
+            self.repeats[len(self.messages)] = (record.repeat_count, record.last_time_ns)
+
+        self.times_ns.append(record.time_ns)
+        self.levels.append(record.level)
+        # loggers pass the same name object for all their records, a single copy is kept without interning it
+        self.logger_names.append(record.logger_name)
+        self.messages.append(record.message)
+        self.args.append(record.args)
+        self.data.append(record.data or None)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        exceptions = self.exceptions
+        for index in range(len(self.messages)):
+            if index in exceptions:
+                record = ExceptionLogRecord.__new__(ExceptionLogRecord)
+                record.exception = exceptions[index]
+            else:
+                record = LogRecord.__new__(LogRecord)
+
+            record.time_ns = self.times_ns[index]
+            record._time = None
+            record.logger_name = self.logger_names[index]
+            level = self.levels[index]
+            record.level = _LOG_LEVELS.get(level, level)
+            record.message = self.messages[index]
+            record.args = self.args[index]
+            record.data = self.data[index] or {}
+            record._formatted = None
+
+            if index in self.repeats:
+                repeat_count, last_time_ns = self.repeats[index]
+                record = _to_repeated_record(record, repeat_count, last_time_ns)
+            yield record
+
+    def to_records(self) -> List[LogRecord]:
+        return list(self)
+
+
+def _to_records(records: Union[List[LogRecord], RecordBatch]) -> List[LogRecord]:
+    if isinstance(records, RecordBatch):
+        return records.to_records()
+    return records
+
+
 class LogTarget(ABC):
     """Base class for logs targets: targets send the log records
     (created by loggers) to the appropriate destination."""
@@ -60,6 +455,42 @@ class LogTarget(ABC):
     async def log(self, record: LogRecord):
         """Logs a record to a destination."""
 
+    async def log_many(self, records: List[LogRecord]):
+        """Logs many records; by default, calls the log method for each record.
+        Targets able to handle records in groups should override this method."""
+        for record in records:
+            await self.log(record)
+
+    async def dispose(self):
+        """Releases resources used by the target, when the logger factory is disposed."""
+
+    def log_nowait(self, record: LogRecord):
+        """Logs a record without waiting: by default, runs the log method synchronously until it suspends,
+        completing it in a task of the running event loop; without a running event loop, a record whose logging
+        suspends is dropped. Failures are notified using RuntimeWarning.
+        Targets able to enqueue records synchronously should override this method."""
+        coroutine = self.log(record)
+        try:
+            yielded = coroutine.send(None)
+        except StopIteration:
+            # the common case: the log method completed without suspending
+            return
+        except Exception as ex:
+            warnings.warn(f'Failed to log record for {self.__class__.__name__}. '
+                          f'Exception: {str(ex)}', RuntimeWarning)
+            return
+
+        loop = _get_running_loop()
+        if loop is None:
+            coroutine.close()
+            warnings.warn(f'Failed to log record for {self.__class__.__name__}: logging must wait, '
+                          f'but no event loop is running, hence the record is lost', RuntimeWarning)
+            return
+
+        task = loop.create_task(_complete(_SuspendedCoroutine(coroutine, yielded)))
+        _pending_tasks.add(task)
+        task.add_done_callback(partial(_on_log_task_done, self))
+
 
 class FlushLogTarget(LogTarget, ABC):
     """Base class for flushing log targets: targets that send the log records
@@ -71,10 +502,28 @@ class FlushLogTarget(LogTarget, ABC):
                  fallback_target: Optional[LogTarget] = None,
                  max_retries: int = 3,
                  retry_delay: float = 0.6,
-                 progressive_delay: bool = True):
-
-        if queue is None:
-            queue = Queue()
+                 progressive_delay: bool = True,
+                 background_flush: bool = False,
+                 flush_interval: Optional[float] = None,
+                 max_queue_size: int = 0,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 overflow_level: LogLevel = LogLevel.NONE,
+                 retry_in_background: bool = False,
+                 exponential_backoff: bool = False,
+                 retry_jitter: float = 0.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 record_batches: bool = False,
+                 collapse_duplicates: bool = False):
+
+        if queue is not None:
+            warnings.warn('The queue parameter is deprecated: records are kept in a buffer, '
+                          'use max_queue_size to bound it', DeprecationWarning)
+            if not max_queue_size:
+                # the bound of the given queue is kept
+                max_queue_size = queue.maxsize
+
+        if max_queue_size and max_queue_size < max_size:
+            raise ValueError('max_queue_size must be 0 (unbounded) or greater than or equal to max_size')
 
         if max_size < 1:
             raise ValueError('max_size must be positive and greater than 1')
@@ -82,50 +531,375 @@ class FlushLogTarget(LogTarget, ABC):
         if retry_delay < 0:
             raise ValueError('retry_delay must be a positive number, to disable delays use max_retries parameter')
 
-        self._queue = queue
+        if not 0 <= retry_jitter <= 1:
+            raise ValueError('retry_jitter must be a number between 0 and 1')
+
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError('flush_interval must be a positive number')
+
+        # records are appended to a deque, swapped with a new one when flushing;
+        # a deque allows dropping the oldest record in constant time, when the queue is full
+        self._buffer = deque()  # type: deque
+        self._max_queue_size = max_queue_size
+        self._buffer_flushed = None  # type: Optional[asyncio.Event]
         self._max_length = max_size
         self._fallback_target = fallback_target
         self._max_retries = max_retries
         self._retry_delay = retry_delay
         self._progressive_delay = progressive_delay
+        self._background_flush = background_flush
+        self._flush_requested = None  # type: Optional[asyncio.Event]
+        self._worker = None  # type: Optional[asyncio.Task]
+        self._flush_interval = flush_interval
+        self._linger_handle = None  # type: Optional[asyncio.TimerHandle]
+        self._overflow_policy = overflow_policy
+        self._overflow_level = overflow_level
+        self._dropped_records = 0
+        self._retry_in_background = retry_in_background
+        self._exponential_backoff = exponential_backoff
+        self._retry_jitter = retry_jitter
+        # failed batches waiting to be retried: (due time, sequence, attempt, records)
+        self._parked_batches = []
+        self._parked_sequence = 0
+        self._retry_task = None  # type: Optional[asyncio.Task]
+        self._batch_parked = None  # type: Optional[asyncio.Event]
+        self._circuit_breaker = circuit_breaker
+        self._record_batches = record_batches
+        self._collapse_duplicates = collapse_duplicates
+        self._in_flight_records = 0
+        self._lost_records = 0
+
+    @property
+    def lost_records(self) -> int:
+        """Returns the number of records that could not be logged, neither using the fallback target."""
+        return self._lost_records
+
+    @property
+    def dropped_records(self) -> int:
+        """Returns the number of records dropped because the queue was full."""
+        return self._dropped_records
 
     def get_delay(self, attempt):
-        if self._progressive_delay:
-            return self._retry_delay * attempt
-        return self._retry_delay
+        if self._exponential_backoff:
+            delay = self._retry_delay * 2 ** (attempt - 1)
+        elif self._progressive_delay:
+            delay = self._retry_delay * attempt
+        else:
+            delay = self._retry_delay
+
+        if self._retry_jitter:
+            delay *= random.uniform(1 - self._retry_jitter, 1 + self._retry_jitter)
+        return delay
 
     async def log(self, record: LogRecord):
         if not record:
             return
-        await self._queue.put(record)
+
+        if self._max_queue_size and self.is_full() and not await self._handle_overflow(record):
+            return
+
+        self._buffer.append(record)
+
+        if self._flush_interval is not None and self._linger_handle is None:
+            self._start_flush_interval(asyncio.get_running_loop())
+
+        if self.should_flush():
+            if self._background_flush:
+                self.request_flush()
+            else:
+                await self.flush()
+
+    async def log_many(self, records: List[LogRecord]):
+        if self._max_queue_size:
+            # records are enqueued one by one, to apply the overflow policy
+            for record in records:
+                await self.log(record)
+            return
+
+        self._buffer.extend(record for record in records if record)
+
+        if self._buffer and self._flush_interval is not None and self._linger_handle is None:
+            self._start_flush_interval(asyncio.get_running_loop())
+
+        if self.should_flush():
+            if self._background_flush:
+                self.request_flush()
+            else:
+                await self.flush()
+
+    def log_nowait(self, record: LogRecord):
+        """Enqueues a record without waiting; when flushing is necessary, it is done by the background worker.
+        If no event loop is running, records are kept in memory until the next flush."""
+        if not record:
+            return
+
+        if self._max_queue_size and self.is_full() and not self._handle_overflow_nowait(record):
+            return
+
+        self._buffer.append(record)
+
+        loop = _get_running_loop()
+        if loop is None:
+            return
+
+        if self._flush_interval is not None and self._linger_handle is None:
+            self._start_flush_interval(loop)
 
         if self.should_flush():
+            self.request_flush()
+
+    async def _handle_overflow(self, record: LogRecord) -> bool:
+        """Applies the overflow policy for a record that doesn't fit in the queue;
+        returns a value indicating whether the record should be enqueued."""
+        policy = self._overflow_policy
+
+        if record.level >= self._overflow_level and policy is OverflowPolicy.FALLBACK \
+                and self._fallback_target is not None:
+            await self._fallback_target.log(record)
+            return False
+
+        if policy is not OverflowPolicy.BLOCK or record.level < self._overflow_level:
+            return self._handle_overflow_nowait(record)
+
+        if self._background_flush:
+            # the record is enqueued when the worker makes room
+            while self.is_full():
+                self.request_flush()
+                await self._wait_for_flush()
+        else:
             await self.flush()
+        return True
+
+    async def _wait_for_flush(self):
+        if self._buffer_flushed is None:
+            self._buffer_flushed = asyncio.Event()
+        self._buffer_flushed.clear()
+        await self._buffer_flushed.wait()
+
+    def _handle_overflow_nowait(self, record: LogRecord) -> bool:
+        policy = self._overflow_policy
+
+        if record.level < self._overflow_level or policy is OverflowPolicy.DROP_NEWEST:
+            self._dropped_records += 1
+            return False
+
+        if policy is OverflowPolicy.DROP_OLDEST:
+            if self._buffer:
+                self._buffer.popleft()
+                self._dropped_records += 1
+            return True
+
+        if policy is OverflowPolicy.FALLBACK and self._fallback_target is not None:
+            self._fallback_target.log_nowait(record)
+            return False
+
+        # without waiting, blocking is not possible: the record is dropped
+        self._dropped_records += 1
+        if _get_running_loop() is not None:
+            self.request_flush()
+        return False
+
+    def request_flush(self):
+        """Signals the background worker that records should be flushed,
+        starting the worker if it is not running yet."""
+        if self._worker is None or self._worker.done():
+            self._flush_requested = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._run_worker())
+        self._flush_requested.set()
+
+    def _start_flush_interval(self, loop):
+        # records must not wait in memory longer than the flush interval
+        self._linger_handle = loop.call_later(self._flush_interval, self._on_flush_interval_elapsed)
+
+    def _on_flush_interval_elapsed(self):
+        self._linger_handle = None
+        self.request_flush()
+
+    def _cancel_flush_interval(self):
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+
+    async def _run_worker(self):
+        worker = asyncio.current_task()
+        while True:
+            await self._flush_requested.wait()
+
+            if self._worker is not worker:
+                # the worker was stopped
+                return
+
+            self._flush_requested.clear()
+
+            try:
+                await self.flush()
+            except Exception as flush_ex:
+                # the worker must survive failures, otherwise flushing would stop
+                warnings.warn(f'Failed to flush records for {self.__class__.__name__} '
+                              f'in background. Exception: {str(flush_ex)}', RuntimeWarning)
+
+    async def stop(self):
+        """Stops the background worker, if running, waiting for the flush in progress to complete."""
+        self._cancel_flush_interval()
+        worker = self._worker
+        if worker is None:
+            return
+        self._worker = None
+        self._flush_requested.set()
+        await worker
+
+    def cancel(self):
+        """Cancels the background worker, retries and the flush interval, without flushing."""
+        self._cancel_flush_interval()
+        for task in (self._worker, self._retry_task):
+            if task is not None:
+                task.cancel()
+        self._worker = None
+        self._retry_task = None
+
+    async def dispose(self):
+        """Stops the background worker, if running, and flushes pending records,
+        waiting for failed batches to be retried."""
+        await self.stop()
+        await self.flush()
+
+        if self._retry_task is not None:
+            await self._retry_task
 
     @abstractmethod
-    async def log_records(self, records: List[LogRecord]):
-        """Logs a list of records, flushing if necessary."""
+    async def log_records(self, records: Union[List[LogRecord], RecordBatch]):
+        """Logs a list of records, flushing if necessary; records are passed as a RecordBatch
+        if the target was configured with record_batches."""
+
+    async def log_records_with_retries(self, records: List[LogRecord], attempt: int = 1):
+        while True:
+            if self._is_circuit_open():
+                await self._log_records_with_open_circuit(records)
+                return
+            try:
+                await self.log_records(records)
+                self._on_log_records_success()
+                return
+            except Exception as logging_ex:
+                self._on_log_records_failure()
+                if self._is_circuit_open():
+                    continue
+
+                if attempt > self._max_retries:
+                    await self._try_using_fallback_target(records)
+                    return
+
+                delay = self.get_delay(attempt)
+                self._warn_retry(logging_ex, delay, attempt)
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def _warn_retry(self, logging_ex: Exception, delay: float, attempt: int):
+        details = traceback.format_exception(type(logging_ex), logging_ex, logging_ex.__traceback__)
+        formatted_details = ''.join(details)
+
+        warnings.warn(f'Failed to log records for {self.__class__.__name__}. '
+                      f'Exception: {str(logging_ex)}'
+                      f'Details: {formatted_details}'
+                      f'Trying again in {delay} seconds; failed attempt n. {attempt}', RuntimeWarning)
 
-    async def log_records_with_retries(self, records: List[LogRecord], attempt: int):
+    async def _log_records_parking_failures(self, records: List[LogRecord], attempt: int = 1):
+        if self._is_circuit_open():
+            await self._log_records_with_open_circuit(records)
+            return
         try:
             await self.log_records(records)
+            self._on_log_records_success()
         except Exception as logging_ex:
-            if attempt <= self._max_retries:
-                delay = self.get_delay(attempt)
+            self._on_log_records_failure()
+            if self._is_circuit_open():
+                await self._log_records_with_open_circuit(records)
+                return
+
+            if attempt > self._max_retries:
+                await self._try_using_fallback_target(records)
+                return
 
-                details = traceback.format_exception(type(logging_ex), logging_ex, logging_ex.__traceback__)
-                formatted_details = ''.join(details)
+            delay = self.get_delay(attempt)
+            self._warn_retry(logging_ex, delay, attempt)
+            self._park_batch(records, attempt, delay)
 
-                warnings.warn(f'Failed to log records for {self.__class__.__name__}. '
-                              f'Exception: {str(logging_ex)}'
-                              f'Details: {formatted_details}'
-                              f'Trying again in {delay} seconds; failed attempt n. {attempt}', RuntimeWarning)
+    def _is_circuit_open(self) -> bool:
+        return self._circuit_breaker is not None and not self._circuit_breaker.allow_request()
 
-                await asyncio.sleep(delay)
+    def _on_log_records_success(self):
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.record_success()
 
-                await self.log_records_with_retries(records, attempt + 1)
-            else:
-                await self._try_using_fallback_target(records)
+    def _on_log_records_failure(self):
+        breaker = self._circuit_breaker
+        if breaker is None:
+            return
+
+        breaker.record_failure()
+        if breaker.state is CircuitState.OPEN:
+            warnings.warn(f'Failed to log records for {self.__class__.__name__}. '
+                          f'The circuit is open: records are sent to the fallback target, if configured, '
+                          f'for {breaker.recovery_timeout} seconds', RuntimeWarning)
+
+    async def _log_records_with_open_circuit(self, records: List[LogRecord]):
+        # the destination is considered down: retries are skipped
+        if self._fallback_target:
+            await self._log_to_fallback_target(records)
+        else:
+            self._lost_records += len(records)
+
+    def _park_batch(self, records: List[LogRecord], attempt: int, delay: float):
+        # failed batches are retried by a dedicated task, so that flushing is not held up
+        loop = asyncio.get_running_loop()
+        self._parked_sequence += 1
+        heapq.heappush(self._parked_batches, (loop.time() + delay, self._parked_sequence, attempt, records))
+
+        if self._retry_task is None or self._retry_task.done():
+            self._batch_parked = asyncio.Event()
+            self._retry_task = loop.create_task(self._run_retries())
+        elif self._parked_batches[0][1] == self._parked_sequence:
+            # the batch is due before the one the retry task is waiting for
+            self._batch_parked.set()
+
+    async def _run_retries(self):
+        loop = asyncio.get_running_loop()
+        while self._parked_batches:
+            due_time, _, attempt, records = self._parked_batches[0]
+            delay = due_time - loop.time()
+            if delay > 0:
+                # the wait is interrupted if a batch with an earlier due time is parked meanwhile
+                self._batch_parked.clear()
+                try:
+                    await asyncio.wait_for(self._batch_parked.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._parked_batches)
+            try:
+                await self._log_in_flight(records, self._log_records_parking_failures(records, attempt + 1))
+            except Exception as fallback_ex:
+                # the retry task must survive failures of the fallback target, to retry other batches
+                warnings.warn(f'Failed to log records for {self.__class__.__name__} '
+                              f'using the fallback target. Exception: {str(fallback_ex)}', RuntimeWarning)
+
+    async def _log_in_flight(self, records: List[LogRecord], logging):
+        self._in_flight_records += len(records)
+        try:
+            await logging
+        except BaseException:
+            # includes cancellation, for example when shutdown times out
+            self._lost_records += len(records)
+            raise
+        finally:
+            self._in_flight_records -= len(records)
+
+    @property
+    def pending_records(self) -> int:
+        """Returns the number of records waiting to be flushed, being flushed or retried."""
+        return len(self._buffer) + self._in_flight_records + sum(len(batch[3]) for batch in self._parked_batches)
 
     async def _try_using_fallback_target(self, records: List[LogRecord]):
         fallback = self._fallback_target
@@ -134,57 +908,94 @@ class FlushLogTarget(LogTarget, ABC):
             warnings.warn(f'Failed to log records for {self.__class__.__name__}. '
                           f'Logging failed for configured retried: {self._max_retries}; '
                           f'A fallback target is not configured, hence log records are lost', RuntimeWarning)
+            self._lost_records += len(records)
             return
 
         warnings.warn(f'Failed to log records for {self.__class__.__name__}. '
                       f'Logging failed for configured retried: {self._max_retries}; '
                       f'Using the configured fallback target.', RuntimeWarning)
 
+        await self._log_to_fallback_target(records)
+
+    async def _log_to_fallback_target(self, records: Union[List[LogRecord], RecordBatch]):
+        fallback = self._fallback_target
         if isinstance(fallback, FlushLogTarget):
-            await fallback.log_records(records)
+            await fallback.log_records(fallback._prepare_records(_to_records(records)))
         else:
-            # assume it implements log_record method
-            for record in records:
-                await fallback.log(record)
+            await fallback.log_many(_to_records(records))
 
-    def _get(self):
-        try:
-            return self._queue.get_nowait()
-        except QueueEmpty:
-            return None
+    def _prepare_records(self, records: List[LogRecord]) -> Union[List[LogRecord], RecordBatch]:
+        if self._record_batches:
+            return RecordBatch.from_records(records)
+        return records
+
+    def is_full(self) -> bool:
+        return 0 < self._max_queue_size <= len(self._buffer)
 
     def should_flush(self):
-        return self._max_length <= self._queue.qsize()
+        return self._max_length <= len(self._buffer)
 
     async def flush(self):
-        data = []
-        while True:
-            item = self._get()
-            if not item:
-                break
-            data.append(item)
+        self._cancel_flush_interval()
+        buffer, self._buffer = self._buffer, deque()
+
+        if self._buffer_flushed is not None:
+            self._buffer_flushed.set()
+
+        if buffer:
+            # targets receive records in a list
+            data = list(buffer)
+            if self._collapse_duplicates:
+                data = collapse_duplicates(data)
+            data = self._prepare_records(data)
+            if self._retry_in_background:
+                await self._log_in_flight(data, self._log_records_parking_failures(data))
+            else:
+                await self._log_in_flight(data, self.log_records_with_retries(data, 1))
+
 
-        if data:
-            await self.log_records_with_retries(data, 1)
+class _LoggerOptions:
+    """Options shared by a logger factory with its loggers, so that changes apply to existing loggers."""
+
+    __slots__ = ('min_log_level',
+                 'concurrent_targets')
+
+    def __init__(self, min_log_level: LogLevel, concurrent_targets: bool = False):
+        self.min_log_level = min_log_level
+        self.concurrent_targets = concurrent_targets
 
 
 class Logger:
 
     __slots__ = ('name',
                  '_targets',
-                 'min_log_level',
+                 '_options',
                  'max_log_level')
 
     def __init__(self,
                  name,
                  targets,
                  min_log_level: LogLevel,
-                 max_log_level: LogLevel):
+                 max_log_level: LogLevel,
+                 concurrent_targets: bool = False,
+                 options: Optional[_LoggerOptions] = None):
         self.name = name
         self._targets = targets
-        self.min_log_level = min_log_level
+        self._options = options or _LoggerOptions(min_log_level, concurrent_targets)
         self.max_log_level = max_log_level
 
+    @property
+    def min_log_level(self) -> LogLevel:
+        return self._options.min_log_level
+
+    @property
+    def concurrent_targets(self) -> bool:
+        return self._options.concurrent_targets
+
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        """Returns a value indicating whether any target receives records of the given level."""
+        return bool(self._targets.get(level))
+
     def get_exception(self, exception):
         if isinstance(exception, BaseException):
             return exception
@@ -223,43 +1034,172 @@ class Logger:
     async def critical(self, message, *args, **kwargs):
         await self.log(message, LogLevel.CRITICAL, *args, **kwargs)
 
+    def debug_nowait(self, message, *args, **kwargs):
+        self.log_nowait(message, LogLevel.DEBUG, *args, **kwargs)
+
+    def info_nowait(self, message, *args, **kwargs):
+        self.log_nowait(message, LogLevel.INFORMATION, *args, **kwargs)
+
+    def warning_nowait(self, message, *args, **kwargs):
+        self.log_nowait(message, LogLevel.WARNING, *args, **kwargs)
+
+    def error_nowait(self, message, *args, **kwargs):
+        self.log_nowait(message, LogLevel.ERROR, *args, **kwargs)
+
+    def exception_nowait(self, message, exception=True, *args, **kwargs):
+        self.log_nowait(message, LogLevel.ERROR, *args, exception=exception, **kwargs)
+
+    def critical_nowait(self, message, *args, **kwargs):
+        self.log_nowait(message, LogLevel.CRITICAL, *args, **kwargs)
+
+    def log_nowait(self, message, level: LogLevel = LogLevel.INFORMATION, *args, **kwargs):
+        """Logs a message without awaiting: records are handed to targets using their log_nowait method."""
+        if level > self.max_log_level:
+            raise ValueError(f'Invalid log level {level}, higher than maximum {max(LogLevel)}')
+
+        targets = self._targets.get(level)
+        if not targets:
+            return
+
+        record = self.create_record(message, level, *args, **kwargs)
+
+        for target in targets:
+            target.log_nowait(record)
+
     async def log(self, message, level: LogLevel = LogLevel.INFORMATION, *args, **kwargs):
         if level > self.max_log_level:
             raise ValueError(f'Invalid log level {level}, higher than maximum {max(LogLevel)}')
 
+        # targets by level are precomputed by the logger factory
+        targets = self._targets.get(level)
+        if not targets:
+            # no target would receive the record, don't create it
+            return
+
         record = self.create_record(message, level, *args, **kwargs)
-        current_level = level
-        while current_level >= self.min_log_level:
-            targets = self._targets[current_level]
 
-            for target in targets:
-                await target.log(record)
+        if self._options.concurrent_targets and len(targets) > 1:
+            await self._log_concurrently(record, targets)
+            return
+
+        for target in targets:
+            await target.log(record)
+
+    async def _log_concurrently(self, record: LogRecord, targets):
+        results = await asyncio.gather(*[target.log(record) for target in targets], return_exceptions=True)
+
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                # a failing target must not affect the other targets
+                warnings.warn(f'Failed to log record for {target.__class__.__name__}. '
+                              f'Exception: {str(result)}', RuntimeWarning)
+
+
+class ShutdownStats:
+    """Statistics about records handled when shutting down a logger factory."""
+
+    __slots__ = ('drained_records',
+                 'lost_records',
+                 'unfinished_targets')
+
+    def __init__(self, drained_records: int, lost_records: int, unfinished_targets: List[LogTarget]):
+        self.drained_records = drained_records
+        self.lost_records = lost_records
+        self.unfinished_targets = unfinished_targets
+
+    def __repr__(self):
+        return f'<ShutdownStats drained_records={self.drained_records} lost_records={self.lost_records} ' \
+               f'unfinished_targets={len(self.unfinished_targets)}>'
 
-            current_level -= 10
+
+class _TargetsView(Mapping):
+    """Read-only view of targets by minimum level: targets are added using the add_target method,
+    which updates the dispatch table used by loggers."""
+
+    __slots__ = ('_targets',)
+
+    def __init__(self, targets):
+        self._targets = targets
+
+    def __getitem__(self, level):
+        return tuple(self._targets[level])
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self):
+        return len(self._targets)
 
 
 class LoggerFactory:
 
     __slots__ = ('_targets',
+                 '_closed',
+                 '_dispatch_table',
                  '_instances',
-                 'min_log_level',
+                 '_options',
                  'max_log_level',
                  'on_dispose_error')
 
-    def __init__(self):
+    def __init__(self, max_loggers: Optional[int] = None):
         self._targets = OrderedDict([(x, []) for x in LogLevel])
-        self._instances = {}
-        self.min_log_level = LogLevel.DEBUG if __debug__ else LogLevel.INFORMATION
+        self._closed = False
+        self._dispatch_table = {}
+        self._instances = LRUCache(max_loggers)
+        self._options = _LoggerOptions(LogLevel.DEBUG if __debug__ else LogLevel.INFORMATION)
+        self._update_dispatch_table()
         self.max_log_level = LogLevel(max(LogLevel))
         self.on_dispose_error = None
 
     @property
-    def targets(self):
-        return self._targets
+    def targets(self) -> Mapping:
+        """Returns a read-only view of targets by minimum level."""
+        return _TargetsView(self._targets)
+
+    @property
+    def min_log_level(self) -> LogLevel:
+        return self._options.min_log_level
+
+    @min_log_level.setter
+    def min_log_level(self, value: LogLevel):
+        self._options.min_log_level = value
+        self._update_dispatch_table()
+
+    @property
+    def concurrent_targets(self) -> bool:
+        """Gets or sets a value indicating whether loggers send records to their targets concurrently;
+        changes apply to existing loggers."""
+        return self._options.concurrent_targets
+
+    @concurrent_targets.setter
+    def concurrent_targets(self, value: bool):
+        self._options.concurrent_targets = value
+
+    def _update_dispatch_table(self):
+        # the table is shared with loggers and updated in place, so that loggers
+        # obtain all targets for a level with a single lookup
+        if self._closed:
+            return
+
+        min_log_level = self._options.min_log_level
+        table = {}
+        for level in LogLevel:
+            targets = []
+            current_level = level
+            while current_level >= min_log_level:
+                targets.extend(self._targets[current_level])
+                current_level -= 10
+            table[level] = tuple(targets)
+
+        self._dispatch_table.clear()
+        self._dispatch_table.update(table)
 
     def add_target(self,
                    target: LogTarget,
                    minimum_level: LogLevel = LogLevel.NONE):
+        if self._closed:
+            raise RuntimeError('Cannot add targets to a LoggerFactory that was shut down')
+
         if minimum_level == LogLevel.NONE:
             minimum_level = self.min_log_level
         try:
@@ -267,30 +1207,79 @@ class LoggerFactory:
         except KeyError:
             raise ValueError(f'Invalid minimum_level: {minimum_level}')
 
+        self._update_dispatch_table()
         return self
 
     def get_logger(self, name: str) -> Logger:
-        try:
-            return self._instances[name]
-        except KeyError:
+        logger = self._instances.get(name)
+        if logger is None:
             logger = Logger(name,
-                            self._targets,
+                            self._dispatch_table,
                             self.min_log_level,
-                            self.max_log_level)
+                            self.max_log_level,
+                            options=self._options)
             self._instances[name] = logger
-            return logger
+        return logger
 
-    async def dispose(self):
+    def _get_unique_targets(self) -> List[LogTarget]:
+        # the same target may be configured for several levels
+        unique_targets = {}
+        for targets in self._targets.values():
+            for target in targets:
+                unique_targets[id(target)] = target
+        return list(unique_targets.values())
+
+    async def _dispose_target(self, target: LogTarget):
+        try:
+            await target.dispose()
+        except Exception as ex:
+            # do not rethrow exception because other targets may require flushing;
+            if self.on_dispose_error:
+                self.on_dispose_error(ex)
+
+    async def dispose(self, timeout: Optional[float] = None) -> List[LogTarget]:
+        """Disposes all targets concurrently, flushing flush targets, waiting at most timeout seconds, if specified.
+        Returns the list of targets that did not complete in time."""
         # when a LoggerFactory is disposed, it's necessary to
         # flush all targets that implement flushing of messages,
         # to not lose logs, for example when the application is closed
-        for targets in self._targets.values():
-
-            flush_targets = [target for target in targets if isinstance(target, FlushLogTarget)]
-            for target in flush_targets:
-                try:
-                    await target.flush()
-                except Exception as ex:
-                    # do not rethrow exception because other targets may require flushing;
-                    if self.on_dispose_error:
-                        self.on_dispose_error(ex)
+        targets = self._get_unique_targets()
+        if not targets:
+            return []
+
+        tasks = [asyncio.ensure_future(self._dispose_target(target)) for target in targets]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        if not pending:
+            return []
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        unfinished = [target for target, task in zip(targets, tasks) if task in pending]
+        warnings.warn(f'Flushing did not complete in {timeout} seconds for targets: '
+                      f'{", ".join(target.__class__.__name__ for target in unfinished)}', RuntimeWarning)
+        return unfinished
+
+    async def shutdown(self, timeout: Optional[float] = None) -> ShutdownStats:
+        """Stops accepting records, then disposes all targets waiting at most timeout seconds, if specified,
+        draining records pending in flush targets, including retries; background tasks of targets that did not
+        complete in time are cancelled. Returns statistics about drained and lost records."""
+        self._closed = True
+        # loggers share the dispatch table: without targets, they don't create records anymore
+        self._dispatch_table.clear()
+
+        flush_targets = [target for target in self._get_unique_targets() if isinstance(target, FlushLogTarget)]
+        pending_before = sum(target.pending_records for target in flush_targets)
+        lost_before = sum(target.lost_records for target in flush_targets)
+
+        unfinished = await self.dispose(timeout)
+
+        for target in unfinished:
+            if isinstance(target, FlushLogTarget):
+                target.cancel()
+
+        # records still pending in targets that did not complete in time are lost
+        lost_records = sum(target.pending_records + target.lost_records for target in flush_targets) - lost_before
+        return ShutdownStats(max(pending_before - lost_records, 0), lost_records, unfinished)
@@ -0,0 +1,164 @@
+"""
+Batch encoders for log records, to be used by flush targets in log_records, and NDJSON decoder.
+
+NDJSON encoding uses orjson, if installed, otherwise the built-in json module; msgpack encoding requires msgpack.
+"""
+import json
+import traceback
+from typing import List, Union, Iterable, Optional
+from rolog import LogRecord, ExceptionLogRecord, RecordBatch, LogLevel, _to_repeated_record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+Records = Union[List[LogRecord], RecordBatch]
+
+_LEVEL_NAMES = {level.value: level.name for level in LogLevel}
+
+
+class RemoteException(Exception):
+    """Exception of a decoded record: since exceptions cannot be rebuilt from encoded records,
+    it holds the formatted exception, including traceback."""
+
+
+def format_exception(exception) -> str:
+    if isinstance(exception, BaseException):
+        return ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    return str(exception)
+
+
+class _ExceptionsCache:
+    # the same exception is often logged several times in a batch: it is formatted once
+
+    __slots__ = ('_items',)
+
+    def __init__(self):
+        self._items = {}
+
+    def format(self, exception) -> Optional[str]:
+        if exception is None:
+            # for example, an exception logged outside of an except block
+            return None
+
+        key = id(exception)
+        try:
+            return self._items[key][1]
+        except KeyError:
+            value = format_exception(exception)
+            # the exception is kept, so that its id is not reused during the lifetime of the cache
+            self._items[key] = (exception, value)
+            return value
+
+
+def _level_name(level) -> Union[str, int]:
+    # levels not defined by LogLevel are encoded as numbers
+    return _LEVEL_NAMES.get(level, level)
+
+
+def record_to_dict(record: LogRecord, exceptions: Optional[_ExceptionsCache] = None) -> dict:
+    item = {
+        'time_ns': record.time_ns,
+        'level': _level_name(record.level),
+        'logger_name': record.logger_name,
+        'message': record.message,
+        'args': record.args,
+        'data': record.data
+    }
+
+    if isinstance(record, ExceptionLogRecord):
+        item['exception'] = (exceptions or _ExceptionsCache()).format(record.exception)
+    if record.repeat_count > 1:
+        item['repeat_count'] = record.repeat_count
+        item['last_time_ns'] = record.last_time_ns
+    return item
+
+
+def records_to_dicts(records: Records) -> Iterable[dict]:
+    exceptions = _ExceptionsCache()
+
+    if not isinstance(records, RecordBatch):
+        for record in records:
+            yield record_to_dict(record, exceptions)
+        return
+
+    # batches are read by columns, without creating records
+    batch_exceptions = records.exceptions
+    batch_repeats = records.repeats
+    for index, (time_ns, level, logger_name, message, args, data) in enumerate(zip(records.times_ns,
+                                                                                   records.levels,
+                                                                                   records.logger_names,
+                                                                                   records.messages,
+                                                                                   records.args,
+                                                                                   records.data)):
+        item = {
+            'time_ns': time_ns,
+            'level': _level_name(level),
+            'logger_name': logger_name,
+            'message': message,
+            'args': args,
+            'data': data or {}
+        }
+        if index in batch_exceptions:
+            item['exception'] = exceptions.format(batch_exceptions[index])
+        if index in batch_repeats:
+            item['repeat_count'], item['last_time_ns'] = batch_repeats[index]
+        yield item
+
+
+def _default(value):
+    return str(value)
+
+
+def to_ndjson(records: Records) -> bytes:
+    """Encodes records as newline delimited JSON, one object per record."""
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        dumps = orjson.dumps
+        return b''.join(dumps(item, default=_default, option=option) for item in records_to_dicts(records))
+
+    encoder = json.JSONEncoder(default=_default, separators=(',', ':'), ensure_ascii=False)
+    return ''.join(encoder.encode(item) + '\n' for item in records_to_dicts(records)).encode('utf8')
+
+
+def to_msgpack(records: Records) -> bytes:
+    """Encodes records as a msgpack array of maps, one map per record."""
+    if msgpack is None:
+        raise ImportError('msgpack is required to encode records with msgpack: pip install rolog[msgpack]')
+
+    return msgpack.packb(list(records_to_dicts(records)), default=_default, use_bin_type=True)
+
+
+def record_from_dict(item: dict) -> LogRecord:
+    level = item['level']
+    if isinstance(level, str):
+        level = LogLevel[level]
+
+    if 'exception' in item:
+        exception = item['exception']
+        record = ExceptionLogRecord(item['logger_name'],
+                                    level,
+                                    item['message'],
+                                    RemoteException(exception) if exception is not None else None,
+                                    *item['args'],
+                                    **item['data'])
+    else:
+        record = LogRecord(item['logger_name'], level, item['message'], *item['args'], **item['data'])
+
+    record.time_ns = item['time_ns']
+    if 'repeat_count' in item:
+        return _to_repeated_record(record, item['repeat_count'], item['last_time_ns'])
+    return record
+
+
+def from_ndjson(value: bytes) -> List[LogRecord]:
+    """Decodes records encoded with to_ndjson; exceptions are decoded as RemoteException."""
+    loads = orjson.loads if orjson is not None else json.loads
+    return [record_from_dict(loads(line)) for line in value.splitlines() if line]
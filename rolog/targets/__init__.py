@@ -1,5 +1,19 @@
+import time
+import heapq
+import random
+import asyncio
 import logging
-from rolog import LogTarget, LogRecord, ExceptionLogRecord
+import threading
+import traceback
+from queue import SimpleQueue
+from operator import itemgetter
+from typing import List, Optional, Dict, Callable
+from rolog import LogTarget, LogRecord, ExceptionLogRecord, LRUCache, LogLevel
+
+
+# time when the built-in logging module was loaded, used for relativeCreated of records (in ns since Python 3.13)
+_LOGGING_START_TIME_NS = logging._startTime if isinstance(logging._startTime, int) \
+    else int(logging._startTime * 1e9)
 
 
 class BuiltInLoggingTarget(LogTarget):
@@ -8,7 +22,47 @@ class BuiltInLoggingTarget(LogTarget):
     def __init__(self, logger: logging.Logger):
         self.logger = logger
 
-    async def log(self, record: LogRecord):
+    def log_record(self, record: LogRecord):
+        data = record.data
+        if data and (len(data) > 1 or 'extra' not in data):
+            # keyword arguments of the built-in logger, such as stack_info, require its standard path
+            self._log_record_using_logger_methods(record)
+            return
+
+        logger = self.logger
+        if isinstance(record, ExceptionLogRecord):
+            level = logging.ERROR
+            exception = record.exception
+            if isinstance(exception, BaseException):
+                exc_info = (type(exception), exception, exception.__traceback__)
+            else:
+                exc_info = exception
+        else:
+            level = record.level.value
+            exc_info = None
+
+        # the built-in logger caches enabled levels, clearing the cache when its configuration changes
+        if not logger.isEnabledFor(level):
+            return
+
+        # the built-in record is created directly from rolog record fields, skipping the inspection of the
+        # stack done by built-in loggers, which would find the caller inside rolog anyway;
+        # message and args are kept, for handlers and filters grouping records by template
+        builtin_record = logger.makeRecord(logger.name,
+                                           level,
+                                           '(unknown file)',
+                                           0,
+                                           record.message,
+                                           record.args,
+                                           exc_info,
+                                           '(unknown function)',
+                                           data.get('extra') if data else None)
+        builtin_record.created = record.time_ns / 1e9
+        builtin_record.msecs = record.time_ns % 1_000_000_000 // 1_000_000
+        builtin_record.relativeCreated = (record.time_ns - _LOGGING_START_TIME_NS) / 1e6
+        logger.handle(builtin_record)
+
+    def _log_record_using_logger_methods(self, record: LogRecord):
         if isinstance(record, ExceptionLogRecord):
             self.logger.exception(record.message,
                                   *record.args,
@@ -21,21 +75,259 @@ class BuiltInLoggingTarget(LogTarget):
                         *record.args,
                         **record.data)
 
+    async def log(self, record: LogRecord):
+        self.log_record(record)
+
+    async def log_many(self, records: List[LogRecord]):
+        for record in records:
+            self.log_record(record)
+
+    def log_nowait(self, record: LogRecord):
+        # built-in loggers are synchronous: records are handled directly, also without a running event loop
+        self.log_record(record)
+
+
+class ThreadedBuiltInLoggingTarget(BuiltInLoggingTarget):
+    """rolog target for loggers from built-in logging module, handling records in a dedicated thread,
+    so that handlers doing I/O (e.g. files, sockets) don't block the event loop"""
+
+    _STOP = object()
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger)
+        self._queue = SimpleQueue()
+        self._thread = None  # type: Optional[threading.Thread]
+        # thread handling the last records enqueued before closing
+        self._draining_thread = None  # type: Optional[threading.Thread]
+        self._lock = threading.Lock()
+
+    def _run(self, queue: SimpleQueue):
+        # each thread has its own queue, so that it alone consumes its stop sentinel
+        while True:
+            record = queue.get()
+            if record is self._STOP:
+                return
+            try:
+                self.log_record(record)
+            except Exception:
+                # like handlers of the built-in logging module, the thread must survive errors
+                if logging.raiseExceptions:
+                    traceback.print_exc()
+
+    async def log(self, record: LogRecord):
+        self.log_nowait(record)
+
+    async def log_many(self, records: List[LogRecord]):
+        for record in records:
+            self.log_nowait(record)
+
+    def log_nowait(self, record: LogRecord):
+        with self._lock:
+            if self._thread is None and self._draining_thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                args=(self._queue,),
+                                                name=f'rolog-{self.logger.name}',
+                                                daemon=True)
+                self._thread.start()
+
+            if self._thread is not None:
+                self._queue.put(record)
+                return
+
+        # the thread is handling the last records before closing, it is not restarted meanwhile:
+        # the record is handled directly, like built-in loggers do
+        self.log_record(record)
+
+    def close(self):
+        """Stops the thread, after records already enqueued are handled."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._thread = None
+            self._draining_thread = thread
+            self._queue.put(self._STOP)
+            self._queue = SimpleQueue()
+
+        thread.join()
+
+        with self._lock:
+            self._draining_thread = None
+
+    async def dispose(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
 
 class DynamicBuiltInLoggingTarget(LogTarget):
-    """rolog target for loggers from built-in logging module, obtained dynamically by record logger names"""
+    """rolog target for loggers from built-in logging module, obtained dynamically by record logger names;
+    max_size bounds the cached targets, while the built-in logging module keeps all loggers it creates"""
 
-    def __init__(self):
-        self._instances = {}
+    def __init__(self, max_size: Optional[int] = None):
+        self._instances = LRUCache(max_size)
 
     def get_sync_logger(self, name):
-        try:
-            return self._instances[name]
-        except KeyError:
+        sync_logger = self._instances.get(name)
+        if sync_logger is None:
             sync_logger = BuiltInLoggingTarget(logging.getLogger(name))
             self._instances[name] = sync_logger
-            return sync_logger
+        return sync_logger
 
     async def log(self, record: LogRecord):
         sync_logger = self.get_sync_logger(record.logger_name)
-        await sync_logger.log(record)
+        sync_logger.log_record(record)
+
+    async def log_many(self, records: List[LogRecord]):
+        for record in records:
+            self.get_sync_logger(record.logger_name).log_record(record)
+
+    def log_nowait(self, record: LogRecord):
+        self.get_sync_logger(record.logger_name).log_record(record)
+
+
+_MAX_REPORTED_MESSAGE_LENGTH = 100
+
+
+def _shorten(message) -> str:
+    message = str(message)
+    if len(message) <= _MAX_REPORTED_MESSAGE_LENGTH:
+        return message
+    return message[:_MAX_REPORTED_MESSAGE_LENGTH] + '...'
+
+
+class SamplingTarget(LogTarget):
+    """rolog target wrapping another target, to cap logging cost under load: records are sampled by level,
+    and rate limited using token buckets by logger name and message template; the number of suppressed records
+    is logged periodically to the wrapped target"""
+
+    def __init__(self,
+                 target: LogTarget,
+                 sample_rates: Optional[Dict[LogLevel, float]] = None,
+                 rate_limit: Optional[float] = None,
+                 burst: Optional[int] = None,
+                 report_interval: float = 60.0,
+                 max_keys: int = 10000,
+                 max_report_keys: int = 10,
+                 random_function: Callable[[], float] = random.random,
+                 clock: Callable[[], float] = time.monotonic):
+        if sample_rates and any(not 0 <= rate <= 1 for rate in sample_rates.values()):
+            raise ValueError('sample rates must be numbers between 0 and 1')
+
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError('rate_limit must be a positive number')
+
+        self.target = target
+        self._sample_rates = sample_rates or {}
+        self._rate_limit = rate_limit
+        self._burst = burst if burst is not None else max(1, int(rate_limit or 1))
+        self._report_interval = report_interval
+        self._random = random_function
+        self._clock = clock
+        # token buckets by key, as [tokens, last update time]
+        self._buckets = LRUCache(max_keys)
+        # suppressed records by key, since the last report; at most max_keys keys are counted separately
+        self._max_keys = max_keys
+        self._max_report_keys = max_report_keys
+        self._suppressed = {}
+        self._suppressed_others = 0
+        self._suppressed_records = 0
+        self._last_report = clock()
+
+    @property
+    def suppressed_records(self) -> int:
+        """Returns the total number of suppressed records."""
+        return self._suppressed_records
+
+    def _is_allowed(self, record: LogRecord) -> bool:
+        sample_rate = self._sample_rates.get(record.level)
+        if sample_rate is not None and self._random() >= sample_rate:
+            return False
+
+        if self._rate_limit is None:
+            return True
+
+        now = self._clock()
+        key = (record.logger_name, record.message)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self._burst, now]
+            self._buckets[key] = bucket
+        else:
+            bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate_limit)
+            bucket[1] = now
+
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+    def _filter(self, record: LogRecord) -> bool:
+        if self._is_allowed(record):
+            return True
+
+        key = (record.logger_name, record.message)
+        suppressed = self._suppressed
+        count = suppressed.get(key)
+        if count is not None:
+            suppressed[key] = count + 1
+        elif len(suppressed) < self._max_keys:
+            suppressed[key] = 1
+        else:
+            # for example, messages formatted before logging: each one would be a new key
+            self._suppressed_others += 1
+        self._suppressed_records += 1
+        return False
+
+    def _get_report(self, force: bool = False) -> Optional[LogRecord]:
+        now = self._clock()
+        if not (self._suppressed or self._suppressed_others) \
+                or (not force and now - self._last_report < self._report_interval):
+            return None
+
+        suppressed, self._suppressed = self._suppressed, {}
+        others, self._suppressed_others = self._suppressed_others, 0
+        elapsed, self._last_report = now - self._last_report, now
+
+        # only the most suppressed messages are detailed, to keep the report small
+        total = sum(suppressed.values()) + others
+        top = heapq.nlargest(self._max_report_keys, suppressed.items(), key=itemgetter(1))
+        details = [f'{logger_name}: {_shorten(message)!r} x{count}' for (logger_name, message), count in top]
+        others = total - sum(count for _, count in top)
+        if others:
+            details.append(f'other messages x{others}')
+
+        return LogRecord(__name__,
+                         LogLevel.WARNING,
+                         'Suppressed %d log records in the last %d seconds: %s',
+                         total,
+                         elapsed,
+                         '; '.join(details))
+
+    async def log(self, record: LogRecord):
+        report = self._get_report()
+        if report is not None:
+            await self.target.log(report)
+
+        if self._filter(record):
+            await self.target.log(record)
+
+    async def log_many(self, records: List[LogRecord]):
+        records = [record for record in records if self._filter(record)]
+        report = self._get_report()
+        if report is not None:
+            records.append(report)
+        if records:
+            await self.target.log_many(records)
+
+    def log_nowait(self, record: LogRecord):
+        report = self._get_report()
+        if report is not None:
+            self.target.log_nowait(report)
+
+        if self._filter(record):
+            self.target.log_nowait(record)
+
+    async def dispose(self):
+        report = self._get_report(force=True)
+        if report is not None:
+            await self.target.log(report)
+        await self.target.dispose()
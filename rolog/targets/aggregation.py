@@ -0,0 +1,116 @@
+"""
+Aggregation of records from many processes, for pre-fork deployments: worker processes use UnixSocketTarget to send
+records to a single LogAggregator per host, which runs the real target, for example a FlushLogTarget sending large
+batches to the log sink using a single connection.
+"""
+import os
+import asyncio
+import warnings
+from typing import List, Optional
+from rolog import FlushLogTarget, LogRecord, LogTarget
+from rolog.serializers import to_ndjson, from_ndjson
+
+
+class UnixSocketTarget(FlushLogTarget):
+    """Flush target that sends records to a LogAggregator through a Unix socket, encoded as NDJSON"""
+
+    def __init__(self,
+                 path: str,
+                 *,
+                 max_size: int = 100,
+                 flush_interval: Optional[float] = 0.5,
+                 **kwargs):
+        super().__init__(max_size=max_size, flush_interval=flush_interval, **kwargs)
+        self.path = path
+        self._writer = None  # type: Optional[asyncio.StreamWriter]
+
+    async def _get_writer(self) -> asyncio.StreamWriter:
+        if self._writer is None or self._writer.is_closing():
+            _, self._writer = await asyncio.open_unix_connection(self.path)
+        return self._writer
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def log_records(self, records: List[LogRecord]):
+        writer = await self._get_writer()
+        try:
+            writer.write(to_ndjson(records))
+            await writer.drain()
+        except Exception:
+            # the connection is opened again when records are retried
+            self._close_writer()
+            raise
+
+    async def dispose(self):
+        try:
+            await super().dispose()
+        finally:
+            self._close_writer()
+
+
+class LogAggregator:
+    """Unix socket server receiving records from UnixSocketTarget instances in other processes,
+    and logging them to a target"""
+
+    def __init__(self, path: str, target: LogTarget, read_size: int = 2 ** 16):
+        self.path = path
+        self.target = target
+        self.read_size = read_size
+        self._server = None  # type: Optional[asyncio.AbstractServer]
+        self._connections = set()
+
+    async def start(self):
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        remainder = b''
+        try:
+            while True:
+                chunk = await reader.read(self.read_size)
+                if not chunk:
+                    break
+
+                # all complete lines received are decoded and logged in a single group
+                data = remainder + chunk
+                end = data.rfind(b'\n') + 1
+                remainder = data[end:]
+                if end:
+                    await self._log(data[:end])
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _log(self, data: bytes):
+        try:
+            records = from_ndjson(data)
+        except ValueError as decode_ex:
+            warnings.warn(f'Failed to decode records in {self.__class__.__name__}. '
+                          f'Exception: {str(decode_ex)}', RuntimeWarning)
+            return
+
+        try:
+            await self.target.log_many(records)
+        except Exception as logging_ex:
+            # the connection is kept open, to log records received next
+            warnings.warn(f'Failed to log records in {self.__class__.__name__} '
+                          f'using {self.target.__class__.__name__}. Exception: {str(logging_ex)}', RuntimeWarning)
+
+    async def stop(self):
+        """Stops accepting connections and closes open connections; the target is not disposed."""
+        if self._server is None:
+            return
+
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
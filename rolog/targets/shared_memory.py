@@ -0,0 +1,184 @@
+"""
+Hand-off of records between processes through a ring buffer in shared memory: SharedMemoryRingTarget writes records in
+the ring without system calls, SharedMemoryRingReader reads them in another process, for example to log them to a
+FlushLogTarget.
+
+Each ring supports a single producer and a single consumer: the producer advances the write position after writing a
+record, the consumer advances the read position after reading records. Records are encoded as NDJSON lines, prefixed
+by their length.
+"""
+import os
+import asyncio
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+from rolog import LogTarget, LogRecord
+from rolog.serializers import to_ndjson, from_ndjson
+
+
+_HEADER = struct.Struct('<QQ')
+_POSITION = struct.Struct('<Q')
+_LENGTH = struct.Struct('<I')
+_WRITE_POSITION_OFFSET = 0
+_READ_POSITION_OFFSET = _POSITION.size
+
+# names of rings created by this process, tracked by its resource tracker until the producer unlinks them
+_created_names = set()
+
+
+class _Ring:
+
+    def __init__(self, memory: SharedMemory):
+        self.memory = memory
+        self.buffer = memory.buf
+        self.capacity = memory.size - _HEADER.size
+
+    def get_write_position(self) -> int:
+        return _POSITION.unpack_from(self.buffer, _WRITE_POSITION_OFFSET)[0]
+
+    def set_write_position(self, value: int):
+        _POSITION.pack_into(self.buffer, _WRITE_POSITION_OFFSET, value)
+
+    def get_read_position(self) -> int:
+        return _POSITION.unpack_from(self.buffer, _READ_POSITION_OFFSET)[0]
+
+    def set_read_position(self, value: int):
+        _POSITION.pack_into(self.buffer, _READ_POSITION_OFFSET, value)
+
+    def write(self, position: int, data: bytes):
+        offset = position % self.capacity
+        first_part = min(len(data), self.capacity - offset)
+        start = _HEADER.size + offset
+        self.buffer[start:start + first_part] = data[:first_part]
+        if first_part < len(data):
+            # the data wraps around the end of the ring
+            self.buffer[_HEADER.size:_HEADER.size + len(data) - first_part] = data[first_part:]
+
+    def read(self, position: int, length: int) -> bytes:
+        offset = position % self.capacity
+        first_part = min(length, self.capacity - offset)
+        start = _HEADER.size + offset
+        data = bytes(self.buffer[start:start + first_part])
+        if first_part < length:
+            data += bytes(self.buffer[_HEADER.size:_HEADER.size + length - first_part])
+        return data
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+
+
+def _attach(name: str) -> SharedMemory:
+    # the consumer must not unlink the memory of the producer when it exits: the resource tracker of the consumer
+    # process unlinks the memory it tracks
+    try:
+        return SharedMemory(name, track=False)
+    except TypeError:
+        # before Python 3.13, attached memory is always tracked
+        memory = SharedMemory(name)
+        if os.name == 'posix' and memory.name not in _created_names:
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        return memory
+
+
+class SharedMemoryRingTarget(LogTarget):
+    """Target writing records to a ring buffer in shared memory, read by a SharedMemoryRingReader in another
+    process; when the ring is full, or the target was closed, records are dropped"""
+
+    def __init__(self, name: Optional[str] = None, size: int = 2 ** 22):
+        if size <= _HEADER.size + _LENGTH.size:
+            raise ValueError(f'size must be greater than {_HEADER.size + _LENGTH.size}')
+
+        memory = SharedMemory(name, create=True, size=size)
+        self.name = memory.name
+        _created_names.add(self.name)
+        self._ring = _Ring(memory)
+        self._ring.set_write_position(0)
+        self._ring.set_read_position(0)
+        # the write position is owned by the producer and kept in memory, to not read it for each record
+        self._write_position = 0
+        self._dropped_records = 0
+
+    @property
+    def dropped_records(self) -> int:
+        """Returns the number of records dropped because the ring was full."""
+        return self._dropped_records
+
+    def log_nowait(self, record: LogRecord):
+        ring = self._ring
+        if ring is None:
+            # the target was closed, for example when the logger factory was disposed
+            self._dropped_records += 1
+            return
+
+        payload = to_ndjson([record])
+        size = _LENGTH.size + len(payload)
+
+        if size > ring.capacity - (self._write_position - ring.get_read_position()):
+            self._dropped_records += 1
+            return
+
+        ring.write(self._write_position, _LENGTH.pack(len(payload)) + payload)
+        self._write_position += size
+        # the record is visible to the consumer once the write position is updated
+        ring.set_write_position(self._write_position)
+
+    async def log(self, record: LogRecord):
+        self.log_nowait(record)
+
+    async def log_many(self, records: List[LogRecord]):
+        for record in records:
+            self.log_nowait(record)
+
+    def close(self):
+        """Closes and releases the shared memory; records not read yet are lost."""
+        if self._ring is None:
+            return
+        memory = self._ring.memory
+        self._ring.close()
+        self._ring = None
+        memory.unlink()
+        _created_names.discard(self.name)
+
+    async def dispose(self):
+        self.close()
+
+
+class SharedMemoryRingReader:
+    """Reader of records written by a SharedMemoryRingTarget in another process"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._ring = _Ring(_attach(name))
+
+    def read(self) -> bytes:
+        """Reads all available records, returning them as NDJSON bytes."""
+        ring = self._ring
+        read_position = ring.get_read_position()
+        write_position = ring.get_write_position()
+
+        lines = []
+        while read_position < write_position:
+            length = _LENGTH.unpack(ring.read(read_position, _LENGTH.size))[0]
+            lines.append(ring.read(read_position + _LENGTH.size, length))
+            read_position += _LENGTH.size + length
+
+        # room is made for the producer once records are read
+        ring.set_read_position(read_position)
+        return b''.join(lines)
+
+    def read_records(self) -> List[LogRecord]:
+        """Reads all available records."""
+        return from_ndjson(self.read())
+
+    async def pump(self, target: LogTarget, interval: float = 0.1):
+        """Reads records periodically, logging them to the given target, until cancelled."""
+        while True:
+            records = self.read_records()
+            if records:
+                await target.log_many(records)
+            await asyncio.sleep(interval)
+
+    def close(self):
+        self._ring.close()
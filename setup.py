@@ -24,5 +24,9 @@ setup(name='rolog',
       license='MIT',
       packages=['rolog', 'rolog.targets'],
       install_requires=[],
+      extras_require={
+          'orjson': ['orjson'],
+          'msgpack': ['msgpack']
+      },
       include_package_data=True,
       zip_safe=False)
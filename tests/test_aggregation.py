@@ -0,0 +1,131 @@
+import os
+import asyncio
+import tempfile
+import pytest
+from rolog import LoggerFactory, LogLevel
+from rolog.serializers import RemoteException
+from rolog.targets.aggregation import UnixSocketTarget, LogAggregator
+from tests import InMemoryTarget
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths have a short maximum length
+    folder = tempfile.mkdtemp()
+    yield os.path.join(folder, 'rolog.sock')
+    os.rmdir(folder)
+
+
+async def wait_for(condition, timeout=1):
+    loop = asyncio.get_running_loop()
+    end = loop.time() + timeout
+    while not condition() and loop.time() < end:
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_records_are_aggregated_through_unix_socket(socket_path):
+    destination = InMemoryTarget()
+    aggregator = LogAggregator(socket_path, destination)
+    await aggregator.start()
+
+    factories = []
+    for worker in range(2):
+        factory = LoggerFactory()
+        factory.add_target(UnixSocketTarget(socket_path, max_size=3))
+        factories.append(factory)
+
+        logger = factory.get_logger(f'worker-{worker}')
+        for i in range(3):
+            await logger.info('Message %s', i, worker=worker)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        await logger.exception('Oh, no!')
+
+    for factory in factories:
+        await factory.dispose()
+
+    await wait_for(lambda: len(destination.records) == 7)
+    await aggregator.stop()
+
+    assert len(destination.records) == 7
+    assert not os.path.exists(socket_path)
+
+    records = sorted(destination.records[:6], key=lambda item: (item.logger_name, item.args))
+    assert records[0].logger_name == 'worker-0'
+    assert records[0].level is LogLevel.INFORMATION
+    assert records[0].message == 'Message %s'
+    assert records[0].args == (0,)
+    assert records[0].data == {'worker': 0}
+
+    exception_record = destination.records[6]
+    assert isinstance(exception_record.exception, RemoteException)
+    assert 'ZeroDivisionError: division by zero' in str(exception_record.exception)
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_unix_socket_target_uses_fallback_when_aggregator_is_down(socket_path):
+    fallback = InMemoryTarget()
+    target = UnixSocketTarget(socket_path, max_size=2, fallback_target=fallback, max_retries=1, retry_delay=0.001)
+
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger('worker')
+
+    for i in range(2):
+        await logger.info(f'Message: {i}')
+
+    assert [record.message for record in fallback.records] == ['Message: 0', 'Message: 1']
+    await factory.dispose()
+
+
+class FailingOnceTarget(InMemoryTarget):
+
+    def __init__(self):
+        super().__init__()
+        self.attempts = 0
+
+    async def log_many(self, records):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise RuntimeError('Crash Test!')
+        await super().log_many(records)
+
+
+@pytest.mark.asyncio
+async def test_log_aggregator_survives_target_failures(socket_path):
+    destination = FailingOnceTarget()
+    aggregator = LogAggregator(socket_path, destination)
+    await aggregator.start()
+
+    target = UnixSocketTarget(socket_path, max_size=2)
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger('worker')
+
+    with pytest.warns(RuntimeWarning, match='Failed to log records in LogAggregator using FailingOnceTarget'):
+        for i in range(2):
+            await logger.info(f'Message: {i}')
+        await wait_for(lambda: destination.attempts == 1)
+
+    # records received next on the same connection are logged
+    for i in range(2, 4):
+        await logger.info(f'Message: {i}')
+    await wait_for(lambda: len(destination.records) == 2)
+
+    await factory.dispose()
+    await aggregator.stop()
+
+    assert [record.message for record in destination.records] == ['Message: 2', 'Message: 3']
+
+
+def test_unix_socket_target_accepts_options_only_as_keyword_arguments(socket_path):
+    with pytest.raises(TypeError):
+        UnixSocketTarget(socket_path, 10)
+
+    target = UnixSocketTarget(socket_path, max_size=10, max_retries=1)
+    assert target._max_length == 10
+    assert target._max_retries == 1
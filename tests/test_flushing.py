@@ -2,7 +2,10 @@ import pytest
 import asyncio
 from typing import List
 from pytest import raises
-from rolog import LoggerFactory, FlushLogTarget, LogRecord, LogLevel, LogTarget
+import rolog
+from rolog import LoggerFactory, FlushLogTarget, LogRecord, LogLevel, LogTarget, OverflowPolicy, \
+    CircuitBreaker, CircuitState, RecordBatch, ExceptionLogRecord, RepeatedLogRecord, RepeatedExceptionLogRecord, \
+    collapse_duplicates
 from tests import InMemoryTarget
 
 
@@ -328,3 +331,724 @@ async def test_flushing_fallback_nested_flushing_target():
     for record in test_target.fallback.destination:
         assert f'Message: {i}' == record.message
         i += 1
+
+
+class SlowFlushLogTarget(InMemoryFlushLogTarget):
+
+    async def log_records(self, records: List[LogRecord]):
+        await asyncio.sleep(0.01)
+        await super().log_records(records)
+
+
+@pytest.mark.asyncio
+async def test_background_flush_does_not_await_flushing():
+    factory = LoggerFactory()
+    max_size = 5
+    test_target = SlowFlushLogTarget(max_size, background_flush=True)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    for i in range(max_size):
+        await logger.info(f'Message: {i}')
+
+    # the flush happens in the background worker
+    assert len(test_target.destination) == 0
+
+    await asyncio.sleep(0.05)
+
+    assert len(test_target.destination) == max_size
+
+    i = 0
+    for record in test_target.destination:
+        assert f'Message: {i}' == record.message
+        i += 1
+
+    await factory.dispose()
+
+
+@pytest.mark.asyncio
+async def test_background_flush_worker_stopped_when_disposing():
+    factory = LoggerFactory()
+    test_target = SlowFlushLogTarget(2, background_flush=True)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    for i in range(3):
+        await logger.info(f'Message: {i}')
+
+    await factory.dispose()
+
+    # the flush in progress completes and remaining records are flushed
+    assert len(test_target.destination) == 3
+    assert test_target._worker is None
+
+
+@pytest.mark.parametrize('invalid_value', [0, -1])
+def test_flush_target_throws_for_invalid_flush_interval(invalid_value):
+
+    with raises(ValueError, match='flush_interval must be a positive number'):
+        InMemoryFlushLogTarget(flush_interval=invalid_value)
+
+
+@pytest.mark.asyncio
+async def test_flush_interval_flushes_before_reaching_max_size():
+    factory = LoggerFactory()
+    test_target = InMemoryFlushLogTarget(100, flush_interval=0.02)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    for i in range(3):
+        await logger.info(f'Message: {i}')
+
+    assert len(test_target.destination) == 0
+
+    await asyncio.sleep(0.05)
+
+    assert len(test_target.destination) == 3
+
+    await logger.info('Message: 3')
+    await asyncio.sleep(0.05)
+
+    assert len(test_target.destination) == 4
+
+    await factory.dispose()
+
+
+@pytest.mark.asyncio
+async def test_flush_interval_restarts_after_size_flush():
+    test_target = InMemoryFlushLogTarget(2, flush_interval=10)
+
+    await test_target.log(LogRecord('example', LogLevel.INFORMATION, 'One'))
+    assert test_target._linger_handle is not None
+
+    await test_target.log(LogRecord('example', LogLevel.INFORMATION, 'Two'))
+
+    # flushing by size cancels the pending interval
+    assert len(test_target.destination) == 2
+    assert test_target._linger_handle is None
+
+    await test_target.dispose()
+
+
+def test_log_nowait_from_sync_code_keeps_records_until_flush():
+    factory = LoggerFactory()
+    test_target = InMemoryFlushLogTarget(2)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    for i in range(5):
+        logger.info_nowait(f'Message: {i}')
+
+    # without a running event loop, records are kept in memory
+    assert len(test_target.destination) == 0
+
+    asyncio.run(factory.dispose())
+
+    assert [record.message for record in test_target.destination] == [f'Message: {i}' for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_log_nowait_flushes_in_background():
+    factory = LoggerFactory()
+    test_target = InMemoryFlushLogTarget(3)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    for i in range(3):
+        logger.warning_nowait(f'Message: {i}')
+
+    assert len(test_target.destination) == 0
+
+    await asyncio.sleep(0)
+
+    assert len(test_target.destination) == 3
+
+    await factory.dispose()
+
+
+def test_flush_target_throws_for_invalid_max_queue_size():
+
+    with raises(ValueError, match='max_queue_size must be 0'):
+        InMemoryFlushLogTarget(max_size=10, max_queue_size=5)
+
+
+def create_records(count, level=LogLevel.INFORMATION):
+    return [LogRecord('example', level, f'Message: {i}') for i in range(count)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('policy,expected_messages', [
+    (OverflowPolicy.DROP_NEWEST, ['Message: 0', 'Message: 1', 'Message: 2']),
+    (OverflowPolicy.DROP_OLDEST, ['Message: 2', 'Message: 3', 'Message: 4']),
+])
+async def test_flush_target_overflow_drop_policies(policy, expected_messages):
+    test_target = SlowFlushLogTarget(3, max_queue_size=3, overflow_policy=policy, background_flush=True)
+
+    for record in create_records(5):
+        test_target.log_nowait(record)
+
+    assert test_target.dropped_records == 2
+
+    await test_target.dispose()
+
+    assert [record.message for record in test_target.destination] == expected_messages
+
+
+@pytest.mark.asyncio
+async def test_flush_target_overflow_block_policy_flushes():
+    test_target = InMemoryFlushLogTarget(3, max_queue_size=3)
+    # fill the queue without triggering flushes
+    for record in create_records(3):
+        test_target._buffer.append(record)
+
+    await test_target.log(LogRecord('example', LogLevel.INFORMATION, 'Message: 3'))
+
+    assert test_target.dropped_records == 0
+    assert len(test_target.destination) == 3
+
+    await test_target.dispose()
+
+    assert len(test_target.destination) == 4
+
+
+@pytest.mark.asyncio
+async def test_flush_target_overflow_fallback_policy_and_level():
+    fallback = InMemoryTarget()
+    test_target = InMemoryFlushLogTarget(2,
+                                         max_queue_size=2,
+                                         fallback_target=fallback,
+                                         overflow_policy=OverflowPolicy.FALLBACK,
+                                         overflow_level=LogLevel.WARNING)
+    for record in create_records(2):
+        test_target._buffer.append(record)
+
+    await test_target.log(LogRecord('example', LogLevel.INFORMATION, 'Dropped'))
+    await test_target.log(LogRecord('example', LogLevel.ERROR, 'Spilled'))
+
+    assert test_target.dropped_records == 1
+    assert [record.message for record in fallback.records] == ['Spilled']
+    assert len(test_target.destination) == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_target_overflow_block_policy_waits_for_background_flush():
+    test_target = SlowFlushLogTarget(2, max_queue_size=2, background_flush=True)
+
+    for record in create_records(6):
+        await test_target.log(record)
+
+    assert test_target.dropped_records == 0
+
+    await test_target.dispose()
+
+    assert [record.message for record in test_target.destination] == [f'Message: {i}' for i in range(6)]
+
+
+def test_flush_target_queue_parameter_is_deprecated():
+
+    with pytest.warns(DeprecationWarning, match='The queue parameter is deprecated'):
+        InMemoryFlushLogTarget(queue=asyncio.Queue())
+
+
+@pytest.mark.asyncio
+async def test_flush_target_queue_parameter_maxsize_bounds_queue():
+    with pytest.warns(DeprecationWarning):
+        test_target = InMemoryFlushLogTarget(queue=asyncio.Queue(maxsize=3),
+                                             max_size=3,
+                                             background_flush=True,
+                                             overflow_policy=OverflowPolicy.DROP_NEWEST)
+
+    for record in create_records(5):
+        test_target.log_nowait(record)
+
+    assert test_target.is_full()
+    assert test_target.dropped_records == 2
+    test_target.cancel()
+
+    with pytest.warns(DeprecationWarning), raises(ValueError):
+        InMemoryFlushLogTarget(queue=asyncio.Queue(maxsize=3), max_size=10)
+
+
+@pytest.mark.parametrize('retry_delay,attempt,expected_value', [
+    [1, 1, 1],
+    [1, 2, 2],
+    [1, 3, 4],
+    [0.5, 4, 4],
+])
+def test_flush_target_exponential_backoff(retry_delay, attempt, expected_value):
+    target = InMemoryFlushLogTarget(retry_delay=retry_delay, exponential_backoff=True)
+
+    assert target.get_delay(attempt) == expected_value
+
+
+def test_flush_target_retry_jitter():
+    target = InMemoryFlushLogTarget(retry_delay=1, progressive_delay=False, retry_jitter=0.2)
+
+    for _ in range(20):
+        assert 0.8 <= target.get_delay(1) <= 1.2
+
+
+@pytest.mark.parametrize('invalid_value', [-0.1, 1.5])
+def test_flush_target_throws_for_invalid_retry_jitter(invalid_value):
+
+    with raises(ValueError, match='retry_jitter must be a number between 0 and 1'):
+        InMemoryFlushLogTarget(retry_jitter=invalid_value)
+
+
+class FlakyFlushLogTarget(InMemoryFlushLogTarget):
+
+    def __init__(self, failures, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+        self.attempts = 0
+
+    async def log_records(self, records: List[LogRecord]):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise CrashTest()
+        await super().log_records(records)
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flush_target_retry_in_background_does_not_hold_flush():
+    test_target = FlakyFlushLogTarget(1, 2, retry_delay=0.02, retry_in_background=True)
+
+    for record in create_records(2):
+        await test_target.log(record)
+
+    # the failed batch is parked, the caller doesn't wait for the retry
+    assert test_target.attempts == 1
+    assert test_target.pending_records == 2
+
+    for record in create_records(2):
+        await test_target.log(record)
+
+    # new batches continue meanwhile
+    assert len(test_target.destination) == 2
+
+    await asyncio.sleep(0.05)
+
+    assert test_target.pending_records == 0
+    assert len(test_target.destination) == 4
+
+
+@pytest.mark.asyncio
+async def test_flush_target_retries_batches_parked_out_of_due_order():
+    test_target = InMemoryFlushLogTarget(retry_in_background=True)
+    late_records = create_records(2)
+    early_records = create_records(2)
+
+    test_target._park_batch(late_records, 1, 0.5)
+    await asyncio.sleep(0)
+    # the retry task is waiting for the first batch, when a batch due earlier is parked
+    test_target._park_batch(early_records, 1, 0.02)
+
+    await asyncio.sleep(0.1)
+
+    assert test_target.destination == early_records
+    assert test_target.pending_records == 2
+
+    test_target.cancel()
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flush_target_retry_in_background_uses_fallback():
+    test_target = FailingFlushLogTarget(2)
+    test_target._retry_in_background = True
+
+    for record in create_records(2):
+        await test_target.log(record)
+
+    assert not test_target.fallback.records
+
+    await test_target.dispose()
+
+    assert [record.message for record in test_target.fallback.records] == ['Message: 0', 'Message: 1']
+
+
+def test_circuit_breaker_states(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(rolog.time, 'monotonic', lambda: now)
+
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+    now = 110.0
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow_request() is True
+    # other requests are denied while the single attempt is in progress
+    assert breaker.allow_request() is False
+    assert breaker.state is CircuitState.HALF_OPEN
+
+    # a failure in half open state opens the circuit again
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+
+    now = 120.0
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_circuit_breaker_allows_another_attempt_when_outcome_is_not_recorded(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(rolog.time, 'monotonic', lambda: now)
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10)
+    breaker.record_failure()
+
+    now = 110.0
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    # for example, the attempt was cancelled
+    now = 120.0
+    assert breaker.allow_request() is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flush_target_circuit_breaker_half_open_allows_single_attempt():
+    fallback = InMemoryTarget()
+    test_target = SlowFlushLogTarget(1, fallback_target=fallback, circuit_breaker=CircuitBreaker(1, 0.05))
+    test_target._circuit_breaker.record_failure()
+
+    await asyncio.sleep(0.06)
+    records = create_records(3)
+    await asyncio.gather(*[test_target.log_records_with_retries([record]) for record in records])
+
+    # concurrent flushes don't reach the destination while the attempt is in progress
+    assert test_target.destination == records[:1]
+    assert fallback.records == records[1:]
+    assert test_target._circuit_breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.parametrize('failure_threshold,recovery_timeout,message', [
+    (0, 1, 'failure_threshold must be positive'),
+    (1, -1, 'recovery_timeout must be a positive number'),
+])
+def test_circuit_breaker_throws_for_invalid_parameters(failure_threshold, recovery_timeout, message):
+
+    with raises(ValueError, match=message):
+        CircuitBreaker(failure_threshold, recovery_timeout)
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flush_target_circuit_breaker_routes_to_fallback():
+    fallback = InMemoryTarget()
+    test_target = FlakyFlushLogTarget(100,
+                                      2,
+                                      fallback_target=fallback,
+                                      retry_delay=0.001,
+                                      circuit_breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=60))
+
+    for record in create_records(2):
+        await test_target.log(record)
+
+    # the circuit opens after two failures, skipping other retries
+    assert test_target.attempts == 2
+    assert len(fallback.records) == 2
+
+    for record in create_records(4):
+        await test_target.log(record)
+
+    # while the circuit is open, the destination is not called
+    assert test_target.attempts == 2
+    assert len(fallback.records) == 6
+    assert not test_target.destination
+
+
+class InMemoryManyTarget(InMemoryTarget):
+
+    def __init__(self):
+        super().__init__()
+        self.groups = []
+
+    async def log_many(self, records):
+        self.groups.append(len(records))
+        self.records.extend(records)
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flushing_fallback_uses_log_many():
+    fallback = InMemoryManyTarget()
+    test_target = FailingFlushLogTarget(5, fallback_target=fallback)
+
+    for record in create_records(5):
+        await test_target.log(record)
+
+    assert fallback.groups == [5]
+    assert len(fallback.records) == 5
+
+
+@pytest.mark.asyncio
+async def test_log_target_log_many_default_implementation():
+    test_target = InMemoryTarget()
+
+    await test_target.log_many(create_records(3))
+
+    assert [record.message for record in test_target.records] == ['Message: 0', 'Message: 1', 'Message: 2']
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('max_queue_size', [0, 10])
+async def test_flush_target_log_many(max_queue_size):
+    test_target = InMemoryFlushLogTarget(5, max_queue_size=max_queue_size)
+
+    await test_target.log_many(create_records(3))
+
+    assert len(test_target.destination) == 0
+
+    await test_target.log_many(create_records(3))
+
+    assert len(test_target.destination) >= 5
+
+    await test_target.dispose()
+
+    assert len(test_target.destination) == 6
+
+
+@pytest.mark.asyncio
+async def test_logger_factory_dispose_flushes_concurrently_once_per_target():
+    factory = LoggerFactory()
+    target_1 = SlowFlushLogTarget(10)
+    target_2 = SlowFlushLogTarget(10)
+
+    factory \
+        .add_target(target_1, LogLevel.DEBUG) \
+        .add_target(target_1, LogLevel.ERROR) \
+        .add_target(target_2)
+
+    logger = factory.get_logger('example')
+    await logger.error('Oh, no!')
+
+    # the record is logged twice to target_1, configured for two levels
+    assert len(target_1._buffer) == 2
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    unfinished = await factory.dispose()
+    elapsed = loop.time() - start
+
+    assert unfinished == []
+    assert elapsed < 0.02
+    assert len(target_1.destination) == 2
+    assert len(target_2.destination) == 1
+
+
+class HangingFlushLogTarget(InMemoryFlushLogTarget):
+
+    async def log_records(self, records: List[LogRecord]):
+        await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_logger_factory_dispose_timeout_reports_unfinished_targets():
+    factory = LoggerFactory()
+    hanging_target = HangingFlushLogTarget(10)
+    test_target = InMemoryFlushLogTarget(10)
+
+    factory \
+        .add_target(hanging_target) \
+        .add_target(test_target)
+
+    logger = factory.get_logger('example')
+    await logger.info('Hello, World')
+
+    with pytest.warns(RuntimeWarning, match='Flushing did not complete in 0.02 seconds for targets: '
+                                            'HangingFlushLogTarget'):
+        unfinished = await factory.dispose(timeout=0.02)
+
+    assert unfinished == [hanging_target]
+    assert len(test_target.destination) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_logger_factory_shutdown_drains_records_and_retries():
+    factory = LoggerFactory()
+    flaky_target = FlakyFlushLogTarget(1, 2, retry_delay=0.01, retry_in_background=True, background_flush=True)
+    test_target = InMemoryFlushLogTarget(10)
+
+    factory \
+        .add_target(flaky_target) \
+        .add_target(test_target)
+
+    logger = factory.get_logger('example')
+
+    for i in range(3):
+        await logger.info(f'Message: {i}')
+
+    stats = await factory.shutdown(timeout=1)
+
+    assert stats.drained_records == 6
+    assert stats.lost_records == 0
+    assert stats.unfinished_targets == []
+    assert len(flaky_target.destination) == 3
+    assert len(test_target.destination) == 3
+
+    # loggers don't accept records anymore
+    await logger.info('Hello, World')
+    assert logger.is_enabled_for(LogLevel.INFORMATION) is False
+    assert flaky_target.pending_records == 0
+
+    with raises(RuntimeError, match='Cannot add targets'):
+        factory.add_target(InMemoryTarget())
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_logger_factory_shutdown_timeout_reports_lost_records():
+    factory = LoggerFactory()
+    hanging_target = HangingFlushLogTarget(2, background_flush=True)
+    test_target = InMemoryFlushLogTarget(10)
+
+    factory \
+        .add_target(hanging_target) \
+        .add_target(test_target)
+
+    logger = factory.get_logger('example')
+
+    for i in range(3):
+        await logger.info(f'Message: {i}')
+
+    stats = await factory.shutdown(timeout=0.02)
+
+    assert stats.unfinished_targets == [hanging_target]
+    assert stats.drained_records == 3
+    assert stats.lost_records == 3
+    assert hanging_target._worker is None
+
+
+def test_record_batch_round_trip():
+    exception = ValueError('Crash Test!')
+    records = [
+        LogRecord('example', LogLevel.INFORMATION, 'Hello, %s', 'World', id=2016),
+        ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', exception),
+        LogRecord('other', LogLevel.DEBUG, 'Lorem ipsum')
+    ]
+
+    batch = RecordBatch.from_records(records)
+
+    assert len(batch) == 3
+    assert list(batch.levels) == [20, 40, 10]
+    assert batch.data == [{'id': 2016}, None, None]
+    assert batch.exceptions == {1: exception}
+
+    for original, record in zip(records, batch.to_records()):
+        assert type(record) is type(original)
+        assert record.time_ns == original.time_ns
+        assert record.time == original.time
+        assert record.level is original.level
+        assert record.logger_name == original.logger_name
+        assert record.message == original.message
+        assert record.args == original.args
+        assert record.data == original.data
+
+    assert batch.to_records()[1].exception is exception
+
+
+class InMemoryBatchFlushLogTarget(FlushLogTarget):
+
+    def __init__(self, max_size=20, *args, **kwargs):
+        super().__init__(max_size=max_size, record_batches=True, *args, **kwargs)
+        self.batches = []
+
+    async def log_records(self, records):
+        self.batches.append(records)
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+async def test_flush_target_record_batches():
+    test_target = InMemoryBatchFlushLogTarget(3)
+
+    for record in create_records(3):
+        await test_target.log(record)
+
+    assert len(test_target.batches) == 1
+    batch = test_target.batches[0]
+    assert isinstance(batch, RecordBatch)
+    assert batch.messages == ['Message: 0', 'Message: 1', 'Message: 2']
+
+    # fallback targets receive records in the form they expect
+    failing_target = FailingFlushLogTarget(2, fallback_target=InMemoryBatchFlushLogTarget())
+    failing_target._record_batches = True
+
+    for record in create_records(2):
+        await failing_target.log(record)
+
+    assert isinstance(failing_target.fallback.batches[0], RecordBatch)
+    assert len(failing_target.fallback.batches[0]) == 2
+
+    failing_target = FailingFlushLogTarget(2)
+    failing_target._record_batches = True
+
+    for record in create_records(2):
+        await failing_target.log(record)
+
+    assert [record.message for record in failing_target.fallback.records] == ['Message: 0', 'Message: 1']
+
+
+def test_collapse_duplicates():
+    exception = ValueError('Crash Test!')
+    records = [
+        LogRecord('example', LogLevel.ERROR, 'Failed %s', 'request', id=1),
+        ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', exception),
+        LogRecord('example', LogLevel.ERROR, 'Failed %s', 'request', id=1),
+        LogRecord('example', LogLevel.ERROR, 'Failed %s', 'request', id=2),
+        ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', ValueError('Crash Test!')),
+        LogRecord('example', LogLevel.ERROR, 'Failed %s', 'request', id=1),
+        LogRecord('example', LogLevel.ERROR, 'Unhashable', values=[1, 2]),
+        LogRecord('example', LogLevel.ERROR, 'Unhashable', values=[1, 2]),
+    ]
+
+    collapsed = collapse_duplicates(records)
+
+    assert [record.message for record in collapsed] == ['Failed %s', 'Oh, no!', 'Failed %s',
+                                                         'Unhashable', 'Unhashable']
+    assert isinstance(collapsed[0], RepeatedLogRecord)
+    assert collapsed[0].repeat_count == 3
+    assert collapsed[0].time_ns == records[0].time_ns
+    assert collapsed[0].last_time_ns == records[5].time_ns
+    assert collapsed[0].data == {'id': 1}
+
+    assert isinstance(collapsed[1], RepeatedExceptionLogRecord)
+    assert collapsed[1].repeat_count == 2
+    assert collapsed[1].exception is exception
+
+    assert collapsed[2] is records[3]
+    assert collapsed[2].repeat_count == 1
+    assert collapsed[2].last_time_ns is None
+
+
+def test_record_batch_keeps_repeated_records():
+    records = collapse_duplicates(create_records(1) * 3)
+
+    batch = RecordBatch.from_records(records)
+    assert batch.repeats == {0: (3, records[0].last_time_ns)}
+
+    record = batch.to_records()[0]
+    assert isinstance(record, RepeatedLogRecord)
+    assert record.repeat_count == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_target_collapse_duplicates():
+    test_target = InMemoryFlushLogTarget(5, collapse_duplicates=True)
+
+    for i in range(5):
+        await test_target.log(LogRecord('example', LogLevel.ERROR, 'Connection refused'))
+
+    assert len(test_target.destination) == 1
+    assert test_target.destination[0].repeat_count == 5
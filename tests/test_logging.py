@@ -1,9 +1,14 @@
 import os
+import time
 import uuid
+import rolog
+import asyncio
+from datetime import datetime, timedelta
 import pytest
 from pytest import raises
-from rolog import LogLevel, LoggerFactory, LogRecord
-from rolog.targets import BuiltInLoggingTarget, DynamicBuiltInLoggingTarget
+from rolog import LogLevel, LoggerFactory, LogRecord, LogTarget, Logger, LRUCache, ExceptionLogRecord
+from rolog.targets import BuiltInLoggingTarget, DynamicBuiltInLoggingTarget, ThreadedBuiltInLoggingTarget, \
+    SamplingTarget
 import logging
 from tests import InMemoryTarget
 
@@ -266,15 +271,29 @@ def test_logger_factory_get_targets():
     targets = factory.targets
 
     assert targets is not None
-    assert targets[LogLevel.DEBUG] == []
-    assert targets[LogLevel.INFORMATION] == []
-    assert targets[LogLevel.CRITICAL] == [test_target]
+    assert targets[LogLevel.DEBUG] == ()
+    assert targets[LogLevel.INFORMATION] == ()
+    assert targets[LogLevel.CRITICAL] == (test_target,)
 
     second_target = InMemoryTarget()
     factory.add_target(second_target, minimum_level=LogLevel.INFORMATION)
 
-    assert targets[LogLevel.INFORMATION] == [second_target]
-    assert targets[LogLevel.CRITICAL] == [test_target]
+    assert targets[LogLevel.INFORMATION] == (second_target,)
+    assert targets[LogLevel.CRITICAL] == (test_target,)
+
+    # targets are added only using add_target, which updates the dispatch table
+    with raises(TypeError):
+        targets[LogLevel.DEBUG] = [InMemoryTarget()]
+
+
+def test_logger_min_log_level_follows_factory():
+    factory = LoggerFactory()
+    factory.min_log_level = LogLevel.INFORMATION
+    logger = factory.get_logger(__name__)
+
+    factory.min_log_level = LogLevel.DEBUG
+
+    assert logger.min_log_level is LogLevel.DEBUG
 
 
 @pytest.mark.parametrize('invalid_value', [
@@ -285,3 +304,651 @@ def test_logger_factory_raises_invalid_minimum_level(invalid_value):
 
     with raises(ValueError, match='Invalid minimum_level'):
         factory.add_target(InMemoryTarget(), minimum_level=invalid_value)
+
+
+class SlowTarget(InMemoryTarget):
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    async def log(self, record):
+        await asyncio.sleep(self.delay)
+        await super().log(record)
+
+
+class FailingTarget(LogTarget):
+
+    async def log(self, record):
+        raise RuntimeError('Crash Test!')
+
+
+@pytest.mark.asyncio
+async def test_logger_factory_concurrent_targets():
+    factory = LoggerFactory()
+    factory.concurrent_targets = True
+
+    test_target_1 = SlowTarget(0.05)
+    test_target_2 = SlowTarget(0.05)
+    test_target_3 = InMemoryTarget()
+
+    factory \
+        .add_target(test_target_1, LogLevel.INFORMATION) \
+        .add_target(test_target_2, LogLevel.INFORMATION) \
+        .add_target(test_target_3, LogLevel.ERROR)
+
+    logger = factory.get_logger(__name__)
+    assert logger.concurrent_targets is True
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await logger.error('Oh, no!')
+    elapsed = loop.time() - start
+
+    assert elapsed < 0.1
+    assert 'Oh, no!' == test_target_1.records[0].message
+    assert 'Oh, no!' == test_target_2.records[0].message
+    assert 'Oh, no!' == test_target_3.records[0].message
+
+    await logger.info('Hello, World')
+
+    assert 2 == len(test_target_1.records)
+    assert 1 == len(test_target_3.records)
+
+
+@pytest.mark.asyncio
+async def test_logger_factory_concurrent_targets_applies_to_existing_loggers(monkeypatch):
+    factory = LoggerFactory()
+    test_target_1 = InMemoryTarget()
+    test_target_2 = InMemoryTarget()
+    factory.add_target(test_target_1, LogLevel.ERROR)
+
+    logger = factory.get_logger(__name__)
+    factory.concurrent_targets = True
+    assert logger.concurrent_targets is True
+
+    calls = []
+
+    async def log_concurrently(self, record, targets):
+        calls.append(targets)
+
+    monkeypatch.setattr(Logger, '_log_concurrently', log_concurrently)
+
+    # with a single target, records are logged directly
+    await logger.error('Oh, no!')
+    assert not calls
+    assert 1 == len(test_target_1.records)
+
+    factory.add_target(test_target_2, LogLevel.ERROR)
+    await logger.error('Oh, no!')
+    assert calls == [(test_target_1, test_target_2)]
+
+
+@pytest.mark.asyncio
+async def test_logger_factory_concurrent_targets_isolates_errors():
+    factory = LoggerFactory()
+    factory.concurrent_targets = True
+
+    test_target = InMemoryTarget()
+
+    factory \
+        .add_target(FailingTarget()) \
+        .add_target(test_target)
+
+    logger = factory.get_logger(__name__)
+
+    with pytest.warns(RuntimeWarning, match='Failed to log record for FailingTarget'):
+        await logger.info('Hello, World')
+
+    assert 'Hello, World' == test_target.records[0].message
+
+
+def test_logger_factory_dispatch_table_by_level():
+    factory = LoggerFactory()
+    factory.min_log_level = LogLevel.DEBUG
+
+    test_target_1 = InMemoryTarget()
+    test_target_2 = InMemoryTarget()
+
+    factory \
+        .add_target(test_target_1, LogLevel.DEBUG) \
+        .add_target(test_target_2, LogLevel.ERROR)
+
+    logger = factory.get_logger(__name__)
+    table = logger._targets
+
+    assert table[LogLevel.DEBUG] == (test_target_1,)
+    assert table[LogLevel.WARNING] == (test_target_1,)
+    assert table[LogLevel.ERROR] == (test_target_2, test_target_1)
+    assert table[LogLevel.CRITICAL] == (test_target_2, test_target_1)
+
+    # the table is updated when configuration changes
+    test_target_3 = InMemoryTarget()
+    factory.add_target(test_target_3, LogLevel.INFORMATION)
+
+    assert table[LogLevel.DEBUG] == (test_target_1,)
+    assert table[LogLevel.INFORMATION] == (test_target_3, test_target_1)
+
+    factory.min_log_level = LogLevel.INFORMATION
+
+    assert table[LogLevel.DEBUG] == ()
+    assert table[LogLevel.INFORMATION] == (test_target_3,)
+
+
+def test_logger_is_enabled_for():
+    factory = LoggerFactory()
+    factory.min_log_level = LogLevel.DEBUG
+    logger = factory.get_logger(__name__)
+
+    for level in LogLevel:
+        assert logger.is_enabled_for(level) is False
+
+    factory.add_target(InMemoryTarget(), LogLevel.WARNING)
+
+    assert logger.is_enabled_for(LogLevel.DEBUG) is False
+    assert logger.is_enabled_for(LogLevel.INFORMATION) is False
+    assert logger.is_enabled_for(LogLevel.WARNING) is True
+    assert logger.is_enabled_for(LogLevel.CRITICAL) is True
+
+
+@pytest.mark.asyncio
+async def test_logger_does_not_create_records_for_disabled_levels(monkeypatch):
+    factory = LoggerFactory()
+    test_target = InMemoryTarget()
+    factory.add_target(test_target, LogLevel.ERROR)
+    logger = factory.get_logger(__name__)
+
+    created = []
+    create_record = Logger.create_record
+
+    def counting_create_record(self, message, level, *args, **kwargs):
+        created.append(message)
+        return create_record(self, message, level, *args, **kwargs)
+
+    monkeypatch.setattr(Logger, 'create_record', counting_create_record)
+
+    await logger.debug('Lorem ipsum')
+    await logger.info('Hello, World')
+
+    assert created == []
+    assert not test_target.records
+
+    await logger.error('Oh, no!')
+
+    assert created == ['Oh, no!']
+    assert 'Oh, no!' == test_target.records[0].message
+
+
+@pytest.mark.asyncio
+async def test_logger_log_nowait():
+    factory = LoggerFactory()
+    test_target = InMemoryTarget()
+    factory.add_target(test_target, LogLevel.INFORMATION)
+    logger = factory.get_logger(__name__)
+
+    logger.debug_nowait('Lorem ipsum')
+    logger.info_nowait('Hello, World', 1, 2, id=2016)
+
+    try:
+        1 / 0
+    except Exception:
+        logger.exception_nowait('Oh, no!')
+
+    # the default implementation of log_nowait runs the log method until it suspends
+    assert 2 == len(test_target.records)
+    assert 'Hello, World' == test_target.records[0].message
+    assert (1, 2) == test_target.records[0].args
+    assert {'id': 2016} == test_target.records[0].data
+    assert isinstance(test_target.records[1].exception, ZeroDivisionError)
+
+
+@pytest.mark.asyncio
+async def test_logger_log_nowait_warns_for_failing_targets():
+    factory = LoggerFactory()
+    factory.add_target(FailingTarget())
+    logger = factory.get_logger(__name__)
+
+    with pytest.warns(RuntimeWarning, match='Failed to log record for FailingTarget'):
+        logger.info_nowait('Hello, World')
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+
+def test_logger_log_nowait_from_sync_code():
+    factory = LoggerFactory()
+    test_target = InMemoryTarget()
+    factory.add_target(test_target)
+    factory.add_target(SamplingTarget(test_target))
+    logger = factory.get_logger(__name__)
+
+    logger.info_nowait('Hello, %s', 'World')
+
+    assert [record.message for record in test_target.records] == ['Hello, %s', 'Hello, %s']
+
+    # logging that must wait is not possible without a running event loop: the record is lost, without raising
+    factory.add_target(SlowTarget(0))
+    with pytest.warns(RuntimeWarning, match='no event loop is running'):
+        logger.info_nowait('Hello, World')
+
+    # exceptions are not raised to the caller
+    factory = LoggerFactory()
+    factory.add_target(FailingTarget())
+    logger = factory.get_logger(__name__)
+    with pytest.warns(RuntimeWarning, match='Failed to log record for FailingTarget'):
+        logger.info_nowait('Hello, World')
+
+
+@pytest.mark.asyncio
+async def test_logger_log_nowait_completes_suspended_logging():
+    factory = LoggerFactory()
+    test_target = SlowTarget(0.01)
+    factory.add_target(test_target)
+    logger = factory.get_logger(__name__)
+
+    logger.info_nowait('Hello, World')
+    assert not test_target.records
+
+    await asyncio.sleep(0.05)
+
+    assert [record.message for record in test_target.records] == ['Hello, World']
+
+
+@pytest.mark.parametrize('target_type', [BuiltInLoggingTarget, DynamicBuiltInLoggingTarget])
+def test_builtin_logging_targets_log_nowait_from_sync_code(target_type):
+    sync_logger, handler = get_builtin_memory_logger()
+    target = BuiltInLoggingTarget(sync_logger) if target_type is BuiltInLoggingTarget \
+        else DynamicBuiltInLoggingTarget()
+
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger(sync_logger.name)
+
+    logger.info_nowait('Hello, %s', 'World')
+
+    assert handler.records[0].getMessage() == 'Hello, World'
+
+
+def test_record_time_is_utc_datetime_from_time_ns():
+    before = datetime.utcnow()
+    record = LogRecord('example', LogLevel.INFORMATION, 'Hello, World')
+    after = datetime.utcnow()
+
+    assert isinstance(record.time_ns, int)
+    assert record._time is None
+    assert before - timedelta(milliseconds=1) <= record.time <= after + timedelta(milliseconds=1)
+    assert record.time is record.time
+
+    value = datetime(2018, 10, 28, 12, 30, 15, 123456)
+    record.time = value
+
+    assert record.time == value
+    assert record.time_ns == 1540729815123456000
+
+
+@pytest.mark.asyncio
+async def test_builtin_logging_target_log_many():
+    name = str(uuid.uuid4())
+    sync_logger = get_builtin_sync_logger(name)
+
+    target = BuiltInLoggingTarget(sync_logger)
+
+    await target.log_many([
+        LogRecord(name, LogLevel.INFORMATION, 'Lorem ipsum'),
+        LogRecord(name, LogLevel.WARNING, 'dolor sit amet')
+    ])
+
+    with open(name + '.log', mode='rt', encoding='utf8') as file_log:
+        content = file_log.read()
+
+        assert 'INFO - Lorem ipsum' in content
+        assert 'WARNING - dolor sit amet' in content
+
+    os.remove(name + '.log')
+
+
+@pytest.mark.asyncio
+async def test_logger_wrapping_sync_logging_in_thread():
+    name = str(uuid.uuid4())
+    sync_logger = get_builtin_sync_logger(name)
+
+    factory = LoggerFactory()
+    target = ThreadedBuiltInLoggingTarget(sync_logger)
+    factory.add_target(target)
+    logger = factory.get_logger(name)
+
+    await logger.info('Lorem ipsum dolor sit amet')
+    logger.warning_nowait('Consectetur adipiscing elit')
+
+    try:
+        1 / 0
+    except Exception:
+        await logger.exception('Oh, no!')
+
+    assert target._thread is not None
+
+    await factory.dispose()
+
+    assert target._thread is None
+
+    with open(name + '.log', mode='rt', encoding='utf8') as file_log:
+        content = file_log.read()
+
+        assert 'Lorem ipsum dolor sit amet' in content
+        assert 'Consectetur adipiscing elit' in content
+        assert 'ZeroDivisionError: division by zero' in content
+
+    os.remove(name + '.log')
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+
+    cache['a'] = 1
+    cache['b'] = 2
+
+    assert cache.get('a') == 1
+    cache['c'] = 3
+
+    # 'b' is the least recently used item
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+@pytest.mark.parametrize('invalid_value', [0, -1])
+def test_lru_cache_throws_for_invalid_max_size(invalid_value):
+
+    with raises(ValueError, match='max_size must be positive'):
+        LRUCache(invalid_value)
+
+
+def test_logger_factory_max_loggers():
+    factory = LoggerFactory(max_loggers=2)
+
+    logger_1 = factory.get_logger('one')
+    factory.get_logger('two')
+    factory.get_logger('three')
+
+    assert len(factory._instances) == 2
+    assert factory.get_logger('one') is not logger_1
+
+
+def test_dynamic_builtin_logging_target_max_size():
+    target = DynamicBuiltInLoggingTarget(max_size=2)
+
+    for i in range(10):
+        target.get_sync_logger(f'logger-{i % 3}')
+
+    assert len(target._instances) == 2
+    assert target._instances.misses == 10
+
+
+class SlowInMemoryHandler(logging.Handler):
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+@pytest.mark.asyncio
+async def test_threaded_builtin_logging_target_logging_during_dispose():
+    sync_logger, _ = get_builtin_memory_logger()
+    handler = SlowInMemoryHandler(0.05)
+    sync_logger.handlers = [handler]
+
+    factory = LoggerFactory()
+    target = ThreadedBuiltInLoggingTarget(sync_logger)
+    factory.add_target(target)
+    logger = factory.get_logger(sync_logger.name)
+
+    for i in range(3):
+        await logger.info(f'Message: {i}')
+
+    dispose_task = asyncio.ensure_future(factory.dispose(timeout=2))
+    await asyncio.sleep(0.02)
+    # the thread is draining records
+    await logger.info('Message: 3')
+
+    assert await dispose_task == []
+    assert target._thread is None
+    assert sorted(record.getMessage() for record in handler.records) == [f'Message: {i}' for i in range(4)]
+
+    # after closing, a new thread is started for new records
+    await logger.info('Message: 4')
+    assert target._thread is not None
+    target.close()
+    assert len(handler.records) == 5
+
+
+class InMemoryHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def get_builtin_memory_logger(level=logging.DEBUG):
+    sync_logger = logging.getLogger(str(uuid.uuid4()))
+    sync_logger.setLevel(level)
+    sync_logger.propagate = False
+    handler = InMemoryHandler()
+    sync_logger.addHandler(handler)
+    return sync_logger, handler
+
+
+@pytest.mark.asyncio
+async def test_builtin_logging_target_creates_records_from_rolog_records():
+    sync_logger, handler = get_builtin_memory_logger()
+    target = BuiltInLoggingTarget(sync_logger)
+
+    record = LogRecord('example', LogLevel.WARNING, 'Hello, %s', 'World', extra={'request_id': 2016})
+    record.time = datetime(2018, 10, 28, 12, 30, 15, 123456)
+
+    await target.log(record)
+
+    builtin_record = handler.records[0]
+    assert builtin_record.levelno == logging.WARNING
+    assert builtin_record.getMessage() == 'Hello, World'
+    # handlers and filters can group records by template
+    assert builtin_record.msg == 'Hello, %s'
+    assert builtin_record.args == ('World',)
+    assert builtin_record.request_id == 2016
+    assert builtin_record.created == record.time_ns / 1e9
+    assert builtin_record.msecs == 123
+    # the start time of the built-in logging module is in ns since Python 3.13
+    start_time = logging._startTime / 1e9 if isinstance(logging._startTime, int) else logging._startTime
+    assert builtin_record.relativeCreated == pytest.approx((builtin_record.created - start_time) * 1000, abs=1)
+
+    try:
+        1 / 0
+    except Exception as ex:
+        await target.log(ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', ex))
+
+    assert handler.records[1].levelno == logging.ERROR
+    assert handler.records[1].exc_info[0] is ZeroDivisionError
+
+
+@pytest.mark.parametrize('message,args,expected', [
+    ('Hello, World', (), 'Hello, World'),
+    ('Hello, %s', ('World',), 'Hello, World'),
+    ('%s + %d = %.1f', ('a', 1, 2.5), 'a + 1 = 2.5'),
+    ('Hello, %(name)s', ({'name': 'World'},), 'Hello, World'),
+    ('Hello', ('World', 2018), 'Hello World 2018'),
+    ('100%', ('done',), '100% done')
+])
+def test_log_record_formatted(message, args, expected):
+    record = LogRecord('example', LogLevel.INFORMATION, message, *args)
+
+    assert record.formatted == expected
+
+
+def test_log_record_formatted_is_computed_once():
+    class CountingArg:
+        calls = 0
+
+        def __str__(self):
+            CountingArg.calls += 1
+            return 'World'
+
+    record = LogRecord('example', LogLevel.INFORMATION, 'Hello, %s', CountingArg())
+
+    assert record.formatted == 'Hello, World'
+    assert record.formatted == 'Hello, World'
+    assert CountingArg.calls == 1
+
+
+def test_log_record_templates_are_interned():
+    template = ''.join(['Hello, ', '%s'])
+    other_template = ''.join(['Hello, ', '%s'])
+    assert template is not other_template
+
+    first = LogRecord('example', LogLevel.INFORMATION, template, 'World')
+    second = LogRecord('example', LogLevel.INFORMATION, other_template, 'Moon')
+
+    assert first.message is second.message
+
+
+def test_log_record_templates_are_bounded(monkeypatch):
+    monkeypatch.setattr(rolog, '_templates', {})
+    monkeypatch.setattr(rolog, 'MAX_TEMPLATES', 2)
+
+    for i in range(5):
+        LogRecord('example', LogLevel.INFORMATION, f'Message {i}: %s', i)
+
+    assert rolog._templates == {'Message 0: %s': 'Message 0: %s', 'Message 1: %s': 'Message 1: %s'}
+
+
+@pytest.mark.asyncio
+async def test_builtin_logging_target_skips_disabled_levels():
+    sync_logger, handler = get_builtin_memory_logger(logging.WARNING)
+    target = BuiltInLoggingTarget(sync_logger)
+
+    await target.log(LogRecord('example', LogLevel.INFORMATION, 'Hello, World'))
+    assert not handler.records
+
+    # configuration changes are applied
+    sync_logger.setLevel(logging.INFO)
+
+    await target.log(LogRecord('example', LogLevel.INFORMATION, 'Hello, World'))
+    assert len(handler.records) == 1
+
+
+@pytest.mark.asyncio
+async def test_builtin_logging_target_supports_logger_keyword_arguments():
+    sync_logger, handler = get_builtin_memory_logger()
+    target = BuiltInLoggingTarget(sync_logger)
+
+    await target.log(LogRecord('example', LogLevel.INFORMATION, 'Hello, World', stack_info=True))
+
+    assert handler.records[0].stack_info is not None
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.value = 0.0
+
+    def __call__(self):
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_sampling_target_samples_by_level():
+    values = iter([0.1, 0.9, 0.4, 0.6])
+    test_target = InMemoryTarget()
+    target = SamplingTarget(test_target,
+                            sample_rates={LogLevel.DEBUG: 0.5},
+                            random_function=lambda: next(values))
+
+    for i in range(4):
+        await target.log(LogRecord('example', LogLevel.DEBUG, f'Message: {i}'))
+    await target.log(LogRecord('example', LogLevel.ERROR, 'Oh, no!'))
+
+    assert [record.message for record in test_target.records] == ['Message: 0', 'Message: 2', 'Oh, no!']
+    assert target.suppressed_records == 2
+
+
+@pytest.mark.asyncio
+async def test_sampling_target_rate_limit_and_report():
+    clock = FakeClock()
+    test_target = InMemoryTarget()
+    target = SamplingTarget(test_target, rate_limit=2, burst=2, report_interval=10, clock=clock)
+
+    for i in range(5):
+        await target.log(LogRecord('example', LogLevel.WARNING, 'Hot path'))
+    await target.log(LogRecord('example', LogLevel.WARNING, 'Other message'))
+
+    # the rate limit applies by logger name and message template
+    assert [record.message for record in test_target.records] == ['Hot path', 'Hot path', 'Other message']
+    assert target.suppressed_records == 3
+
+    clock.value = 1.0
+    await target.log(LogRecord('example', LogLevel.WARNING, 'Hot path'))
+
+    # tokens are refilled over time, the report is not due yet
+    assert len(test_target.records) == 4
+    assert test_target.records[3].message == 'Hot path'
+
+    clock.value = 11.0
+    await target.log(LogRecord('example', LogLevel.WARNING, 'Hot path'))
+
+    report = test_target.records[-2]
+    assert report.message == 'Suppressed %d log records in the last %d seconds: %s'
+    assert report.args[0] == 3
+    assert "example: 'Hot path' x3" == report.args[2]
+
+
+@pytest.mark.asyncio
+async def test_sampling_target_bounds_suppressed_keys_and_report():
+    test_target = InMemoryTarget()
+    target = SamplingTarget(test_target, sample_rates={LogLevel.WARNING: 0}, max_keys=3, max_report_keys=2)
+
+    for i in range(100):
+        await target.log(LogRecord('example', LogLevel.WARNING, f'Message: {i}'))
+    for i in range(5):
+        await target.log(LogRecord('example', LogLevel.WARNING, 'Message: 2'))
+    await target.log(LogRecord('example', LogLevel.WARNING, 'x' * 1000))
+
+    assert len(target._suppressed) == 3
+    assert target.suppressed_records == 106
+
+    await target.dispose()
+
+    report = test_target.records[0]
+    assert report.args[0] == 106
+    assert report.args[2] == "example: 'Message: 2' x6; example: 'Message: 0' x1; other messages x99"
+
+    # long messages are shortened in reports
+    target = SamplingTarget(test_target, sample_rates={LogLevel.WARNING: 0})
+    await target.log(LogRecord('example', LogLevel.WARNING, 'x' * 1000))
+    await target.dispose()
+
+    assert test_target.records[1].args[2] == f"example: '{'x' * 100}...' x1"
+
+
+@pytest.mark.asyncio
+async def test_sampling_target_reports_when_disposing():
+    test_target = InMemoryTarget()
+    target = SamplingTarget(test_target, sample_rates={LogLevel.INFORMATION: 0})
+
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger('example')
+
+    await logger.info('Hello, World')
+    await factory.dispose()
+
+    assert len(test_target.records) == 1
+    assert test_target.records[0].args[0] == 1
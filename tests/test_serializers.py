@@ -0,0 +1,131 @@
+import json
+import pytest
+from rolog import LogRecord, ExceptionLogRecord, LogLevel, RecordBatch, collapse_duplicates
+from rolog import serializers
+from rolog.serializers import to_ndjson, to_msgpack, record_to_dict, from_ndjson, RemoteException
+
+
+class Custom:
+
+    def __str__(self):
+        return 'custom'
+
+
+def get_records():
+    try:
+        1 / 0
+    except ZeroDivisionError as zero_division_error:
+        exception = zero_division_error
+
+    return [
+        LogRecord('example', LogLevel.INFORMATION, 'Hello, %s', 'World', id=2016, value=Custom()),
+        ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', exception),
+        ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no! Again', exception)
+    ]
+
+
+def assert_items(records, items):
+    assert len(items) == 3
+    assert items[0] == {
+        'time_ns': records[0].time_ns,
+        'level': 'INFORMATION',
+        'logger_name': 'example',
+        'message': 'Hello, %s',
+        'args': ['World'],
+        'data': {'id': 2016, 'value': 'custom'}
+    }
+    assert items[1]['level'] == 'ERROR'
+    assert 'ZeroDivisionError: division by zero' in items[1]['exception']
+    assert items[1]['exception'] == items[2]['exception']
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+@pytest.mark.parametrize('use_batch', [True, False])
+def test_to_ndjson(monkeypatch, use_orjson, use_batch):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(serializers, 'orjson', None)
+
+    records = get_records()
+    value = to_ndjson(RecordBatch.from_records(records) if use_batch else records)
+
+    assert isinstance(value, bytes)
+    assert value.endswith(b'\n')
+
+    assert_items(records, [json.loads(line) for line in value.splitlines()])
+
+
+@pytest.mark.parametrize('use_batch', [True, False])
+def test_to_msgpack(use_batch):
+    msgpack = pytest.importorskip('msgpack')
+
+    records = get_records()
+    value = to_msgpack(RecordBatch.from_records(records) if use_batch else records)
+
+    assert_items(records, msgpack.unpackb(value, raw=False))
+
+
+def test_to_msgpack_requires_msgpack(monkeypatch):
+    monkeypatch.setattr(serializers, 'msgpack', None)
+
+    with pytest.raises(ImportError, match='msgpack is required'):
+        to_msgpack(get_records())
+
+
+def test_record_to_dict():
+    record = LogRecord('example', LogLevel.WARNING, 'Hello, World')
+
+    assert record_to_dict(record) == {
+        'time_ns': record.time_ns,
+        'level': 'WARNING',
+        'logger_name': 'example',
+        'message': 'Hello, World',
+        'args': (),
+        'data': {}
+    }
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_from_ndjson(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(serializers, 'orjson', None)
+
+    records = get_records() + [LogRecord('example', 25, 'Custom level')]
+    decoded = from_ndjson(to_ndjson(records))
+
+    assert len(decoded) == 4
+    assert decoded[0].time_ns == records[0].time_ns
+    assert decoded[0].level is LogLevel.INFORMATION
+    assert decoded[0].args == ('World',)
+    assert decoded[0].data == {'id': 2016, 'value': 'custom'}
+    assert isinstance(decoded[1], ExceptionLogRecord)
+    assert isinstance(decoded[1].exception, RemoteException)
+    assert 'ZeroDivisionError' in str(decoded[1].exception)
+    assert decoded[3].level == 25
+
+
+def test_ndjson_keeps_repeated_records():
+    records = collapse_duplicates([LogRecord('example', LogLevel.ERROR, 'Connection refused') for _ in range(3)])
+
+    for value in (to_ndjson(records), to_ndjson(RecordBatch.from_records(records))):
+        assert b'"repeat_count":3' in value
+
+        decoded = from_ndjson(value)
+        assert decoded[0].repeat_count == 3
+        assert decoded[0].last_time_ns == records[0].last_time_ns
+
+
+@pytest.mark.parametrize('use_batch', [True, False])
+def test_ndjson_keeps_missing_exceptions(use_batch):
+    # for example, logger.exception called outside of an except block
+    records = [ExceptionLogRecord('example', LogLevel.ERROR, 'Oh, no!', None)]
+    value = to_ndjson(RecordBatch.from_records(records) if use_batch else records)
+
+    assert json.loads(value)['exception'] is None
+
+    decoded = from_ndjson(value)
+    assert isinstance(decoded[0], ExceptionLogRecord)
+    assert decoded[0].exception is None
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import asyncio
+import subprocess
+import pytest
+from pytest import raises
+from rolog import LoggerFactory, LogRecord, LogLevel
+from rolog.targets.shared_memory import SharedMemoryRingTarget, SharedMemoryRingReader
+from tests import InMemoryTarget
+
+
+@pytest.fixture
+def target():
+    target = SharedMemoryRingTarget(size=512)
+    yield target
+    target.close()
+
+
+@pytest.mark.asyncio
+async def test_records_are_read_from_shared_memory(target):
+    reader = SharedMemoryRingReader(target.name)
+
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger('example')
+
+    await logger.info('Hello, %s', 'World', id=2016)
+    logger.warning_nowait('Lorem ipsum')
+
+    records = reader.read_records()
+
+    assert [record.message for record in records] == ['Hello, %s', 'Lorem ipsum']
+    assert records[0].args == ('World',)
+    assert records[0].data == {'id': 2016}
+    assert records[1].level is LogLevel.WARNING
+    assert reader.read_records() == []
+
+    reader.close()
+
+
+def test_ring_wraps_around_and_drops_records_when_full(target):
+    reader = SharedMemoryRingReader(target.name)
+
+    for round_number in range(10):
+        for i in range(3):
+            target.log_nowait(LogRecord('example', LogLevel.INFORMATION, f'Message: {round_number}-{i}'))
+
+        records = reader.read_records()
+        assert [record.message for record in records] == [f'Message: {round_number}-{i}' for i in range(3)]
+
+    assert target.dropped_records == 0
+
+    for i in range(10):
+        target.log_nowait(LogRecord('example', LogLevel.INFORMATION, f'Message: {i}'))
+
+    assert target.dropped_records > 0
+    records = reader.read_records()
+    assert len(records) == 10 - target.dropped_records
+    assert records[0].message == 'Message: 0'
+
+    reader.close()
+
+
+@pytest.mark.asyncio
+async def test_reader_pump_logs_to_target(target):
+    reader = SharedMemoryRingReader(target.name)
+    destination = InMemoryTarget()
+    task = asyncio.ensure_future(reader.pump(destination, interval=0.001))
+
+    await target.log(LogRecord('example', LogLevel.INFORMATION, 'Hello, World'))
+    await asyncio.sleep(0.02)
+
+    task.cancel()
+    assert [record.message for record in destination.records] == ['Hello, World']
+    reader.close()
+
+
+def test_shared_memory_target_throws_for_invalid_size():
+
+    with raises(ValueError, match='size must be greater than'):
+        SharedMemoryRingTarget(size=10)
+
+
+READER_PROCESS_CODE = '''
+import sys
+from rolog.targets.shared_memory import SharedMemoryRingReader
+
+reader = SharedMemoryRingReader(sys.argv[1])
+print(len(reader.read_records()))
+reader.close()
+'''
+
+
+def read_in_another_process(name: str) -> int:
+    # a separate interpreter, like an aggregator program, with its own resource tracker
+    completed = subprocess.run([sys.executable, '-c', READER_PROCESS_CODE, name],
+                               capture_output=True,
+                               check=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               timeout=30)
+    return int(completed.stdout)
+
+
+def test_reader_in_another_process_does_not_unlink_the_ring(target):
+    target.log_nowait(LogRecord('example', LogLevel.INFORMATION, 'Hello, World'))
+
+    assert read_in_another_process(target.name) == 1
+    # the resource tracker of the reader process would unlink the memory shortly after the process exits
+    time.sleep(0.5)
+
+    # the ring can be attached again, for example by a restarted reader
+    target.log_nowait(LogRecord('example', LogLevel.INFORMATION, 'Hello, World'))
+    assert read_in_another_process(target.name) == 1
+
+
+@pytest.mark.asyncio
+async def test_records_logged_after_dispose_are_dropped():
+    target = SharedMemoryRingTarget(size=512)
+
+    factory = LoggerFactory()
+    factory.add_target(target)
+    logger = factory.get_logger('example')
+
+    await factory.dispose()
+
+    # for example, requests still in flight
+    await logger.info('Hello, World')
+    logger.info_nowait('Hello, World')
+
+    assert target.dropped_records == 2
+    # closing again has no effect
+    target.close()